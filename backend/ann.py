@@ -0,0 +1,306 @@
+"""Approximate nearest-neighbour (IVF) gallery for large recognition galleries."""
+import logging
+import os
+import threading
+
+import numpy as np
+
+from recognition import MATCH_THRESHOLD, DescriptorGallery
+
+MIN_TRAIN_SIZE = int(os.environ.get("RECOGNITION_IVF_MIN_SIZE", "2048"))  # exact scan below this
+NPROBE = int(os.environ.get("RECOGNITION_IVF_NPROBE", "8"))
+TRAIN_SAMPLE = 16384
+KMEANS_ITERS = 10
+
+logger = logging.getLogger(__name__)
+
+
+class IVFGallery(DescriptorGallery):
+    """Inverted-file index on top of the packed descriptor matrix.
+
+    Rows are clustered around `nlist` k-means centroids; a search only scores the rows
+    in the `nprobe` clusters closest to the query. Each cluster keeps its own copy of its
+    rows, patched in place when a person is added, changed or removed. Centroids are trained
+    once the gallery reaches MIN_TRAIN_SIZE and retrained when it doubles, in a background
+    thread that swaps the new index in when it is done (searches keep using the old one
+    meanwhile), and saved to `path` so a restart only has to re-assign rows. Smaller
+    galleries use the exact scan of the base class.
+    """
+
+    def __init__(self, path: str | None = None, nprobe: int = NPROBE, min_train_size: int = MIN_TRAIN_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self._centroids = None
+        self._centroid_norms = None
+        self._trained_size = 0
+        self._list_of_row = np.empty(0, dtype=np.int32)
+        self._pos_of_row = np.empty(0, dtype=np.int32)  # index of the row in its list, -1 while unlisted
+        self._lists: list[_InvertedList] = []
+        self._loading = False
+        self._epoch = 0  # bumped by load(), so a background training started before it is dropped
+        self._training: threading.Thread | None = None
+        self._changed: set[int] | None = None  # rows written while a background training runs
+
+    def load(self, people) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._centroids = None
+            self._lists = []
+            self._loading = True
+            try:
+                super().load(people)
+            finally:
+                self._loading = False
+            if not self._restore() and len(self) >= self.min_train_size:
+                self.train()
+
+    def upsert(self, person_id: int, name: str, relationship: str, descriptor) -> None:
+        with self._lock:
+            row = self._rows.get(person_id)
+            if row is not None and self._centroids is not None:
+                self._list_remove(row)  # listed again below under its new descriptor
+            super().upsert(person_id, name, relationship, descriptor)
+            row = self._rows.get(person_id)
+            if row is not None:
+                self._note_changed(row)
+                if self._centroids is not None:
+                    self._list_of_row[row] = self._assign(self._matrix[row : row + 1], self._centroids)[0]
+                    self._list_add(row)
+            self._maybe_train()
+
+    def remove(self, person_id: int) -> None:
+        with self._lock:
+            row = self._rows.get(person_id)
+            if row is None:
+                return
+            last = len(self) - 1
+            if self._centroids is not None:
+                self._list_remove(row)
+            super().remove(person_id)
+            if row != last:
+                # the base class moved the last row into the freed slot: follow it in its list
+                self._list_of_row[row] = self._list_of_row[last]
+                self._pos_of_row[row] = pos = self._pos_of_row[last]
+                if self._centroids is not None and pos >= 0:
+                    self._lists[self._list_of_row[row]].rows[pos] = row
+                self._note_changed(row)
+            self._pos_of_row[last] = -1
+
+    def search(self, queries, k: int = 1, threshold: float = MATCH_THRESHOLD) -> list[list[dict]]:
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            if self._centroids is None or q.shape[0] == 0:
+                return super().search(q, k=k, threshold=threshold)
+            nprobe = min(self.nprobe, len(self._centroids))
+            centroid_d2 = self._sq_dists(q, self._centroids, self._centroid_norms)
+            probes = np.argpartition(centroid_d2, nprobe - 1, axis=1)[:, :nprobe]
+            results = []
+            for query, probed in zip(q, probes):
+                lists = [self._lists[l] for l in probed if self._lists[l].size]
+                if not lists:
+                    results.append([])
+                    continue
+                rows = np.concatenate([l.rows[: l.size] for l in lists])
+                d2 = np.concatenate(
+                    [self._sq_dists(query[None, :], l.vectors[: l.size], l.norms[: l.size])[0] for l in lists]
+                )
+                results.append(self._top_matches(rows, d2, k, threshold))
+            return results
+
+    def train(self) -> None:
+        """(Re)build the coarse quantizer from the current rows and assign every row, in this thread."""
+        with self._lock:
+            n = len(self)
+            if n == 0:
+                return
+            centroids = _kmeans(*self._training_sample(n))
+            self._install(centroids, n, self._assign(self._matrix[:n], centroids))
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.path or self._centroids is None:
+                return
+            tmp = self.path + ".tmp.npz"
+            np.savez(tmp, centroids=self._centroids, trained_size=self._trained_size)
+            os.replace(tmp, self.path)
+
+    def _restore(self) -> bool:
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                centroids = data["centroids"].astype(np.float32)
+                trained_size = int(data["trained_size"])
+        except (OSError, KeyError, ValueError):
+            return False
+        if centroids.ndim != 2 or centroids.shape[1] != self.dim or len(self) < self.min_train_size:
+            return False
+        self._install(centroids, trained_size, self._assign(self._matrix[: len(self)], centroids))
+        self._maybe_train()
+        return True
+
+    def _maybe_train(self) -> None:
+        if self._loading or self._training is not None or len(self) < self.min_train_size:
+            return
+        if self._centroids is None or len(self) >= 2 * self._trained_size:
+            self._changed = set()
+            self._training = threading.Thread(target=self._train_in_background, name="ivf-train", daemon=True)
+            self._training.start()
+
+    def _train_in_background(self) -> None:
+        """train() without holding the lock for k-means or for assigning every row.
+
+        The rows are read while other threads may write them: every row written since the training
+        started is in self._changed and is assigned again, under the lock, when the index is swapped in.
+        """
+        try:
+            with self._lock:
+                epoch, n = self._epoch, len(self)
+                sample, nlist, rng = self._training_sample(n)
+                rows = self._matrix[:n]  # a view; a reallocated matrix leaves this one as it was
+            centroids = _kmeans(sample, nlist, rng)
+            assigned = self._assign(rows, centroids)
+            with self._lock:
+                if epoch != self._epoch:
+                    return
+                m = len(self)
+                lists = np.empty(m, dtype=np.int32)
+                lists[: min(n, m)] = assigned[: min(n, m)]
+                stale = np.array(sorted(row for row in self._changed if row < m), dtype=np.int64)
+                if len(stale):
+                    lists[stale] = self._assign(self._matrix[stale], centroids)
+                self._install(centroids, n, lists)
+            self.save()
+        except Exception:
+            logger.exception("Could not train the recognition index; searches keep using the previous one")
+        finally:
+            with self._lock:
+                self._training = None
+                self._changed = None
+
+    def _training_sample(self, n: int):
+        """(rows to cluster, number of lists, rng) for a gallery of `n` rows."""
+        nlist = int(min(4096, max(16, np.sqrt(n))))
+        rng = np.random.default_rng(0)
+        sample = self._matrix[:n]
+        if n > TRAIN_SAMPLE:
+            sample = sample[rng.choice(n, TRAIN_SAMPLE, replace=False)]
+        else:
+            sample = sample.copy()
+        return sample, min(nlist, len(sample)), rng
+
+    def _install(self, centroids, trained_size: int, list_of_row) -> None:
+        """Swap in new centroids with the list of every row, and rebuild the inverted lists."""
+        n = len(self)
+        self._centroids = centroids
+        self._centroid_norms = (centroids**2).sum(axis=1)
+        self._trained_size = trained_size
+        self._list_of_row[:n] = list_of_row
+        order = np.argsort(self._list_of_row[:n], kind="stable")
+        offsets = np.searchsorted(self._list_of_row[:n][order], np.arange(len(centroids) + 1))
+        self._lists = []
+        for l in range(len(centroids)):
+            rows = order[offsets[l] : offsets[l + 1]]
+            self._pos_of_row[rows] = np.arange(len(rows))
+            self._lists.append(_InvertedList(rows, self._matrix[rows], self._sq_norms[rows]))
+        self._pos_of_row[n:] = -1
+
+    def _note_changed(self, row: int) -> None:
+        if self._changed is not None:
+            self._changed.add(row)
+
+    def _list_add(self, row: int) -> None:
+        inverted = self._lists[self._list_of_row[row]]
+        self._pos_of_row[row] = inverted.append(row, self._matrix[row], self._sq_norms[row])
+
+    def _list_remove(self, row: int) -> None:
+        pos = self._pos_of_row[row]
+        if pos < 0:
+            return
+        moved = self._lists[self._list_of_row[row]].pop(pos)
+        if moved is not None:
+            self._pos_of_row[moved] = pos
+        self._pos_of_row[row] = -1
+
+    def _assign(self, vectors, centroids) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        sq = (centroids**2).sum(axis=1)
+        for start in range(0, len(vectors), 4096):
+            chunk = vectors[start : start + 4096]
+            out[start : start + len(chunk)] = self._sq_dists(chunk, centroids, sq).argmin(axis=1)
+        return out
+
+    def _reserve(self, size: int) -> None:
+        super()._reserve(size)
+        capacity = self._matrix.shape[0]
+        if self._list_of_row.shape[0] < capacity:
+            grown = np.zeros(capacity, dtype=np.int32)
+            grown[: self._list_of_row.shape[0]] = self._list_of_row
+            self._list_of_row = grown
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[: self._pos_of_row.shape[0]] = self._pos_of_row
+            self._pos_of_row = grown
+
+
+class _InvertedList:
+    """The rows of one cluster with a copy of their descriptors, so probing it scans one contiguous block.
+
+    Appends grow the buffers by doubling; a removal moves the last entry into the freed slot.
+    """
+
+    def __init__(self, rows, vectors, norms):
+        self.size = len(rows)
+        capacity = max(8, self.size + self.size // 4)
+        self.rows = np.empty(capacity, dtype=np.int32)
+        self.vectors = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+        self.norms = np.empty(capacity, dtype=np.float32)
+        self.rows[: self.size] = rows
+        self.vectors[: self.size] = vectors
+        self.norms[: self.size] = norms
+
+    def append(self, row: int, vector, norm: float) -> int:
+        if self.size == len(self.rows):
+            capacity = 2 * len(self.rows)
+            self.rows = np.resize(self.rows, capacity)
+            vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[: self.size] = self.vectors[: self.size]
+            self.vectors = vectors
+            self.norms = np.resize(self.norms, capacity)
+        pos = self.size
+        self.rows[pos] = row
+        self.vectors[pos] = vector
+        self.norms[pos] = norm
+        self.size += 1
+        return pos
+
+    def pop(self, pos: int) -> int | None:
+        """Remove entry `pos`; returns the row moved into its place (None if it was the last entry)."""
+        self.size -= 1
+        last = self.size
+        if pos == last:
+            return None
+        self.rows[pos] = self.rows[last]
+        self.vectors[pos] = self.vectors[last]
+        self.norms[pos] = self.norms[last]
+        return int(self.rows[pos])
+
+
+def _kmeans(x, k: int, rng, iters: int = KMEANS_ITERS) -> np.ndarray:
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    x_sq = (x * x).sum(axis=1)
+    for _ in range(iters):
+        d2 = x_sq[:, None] - 2.0 * (x @ centroids.T) + (centroids**2).sum(axis=1)[None, :]
+        labels = d2.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, x)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # re-seed empty clusters from random points so every list stays useful
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = x[rng.choice(len(x), len(empty), replace=False)]
+    return centroids.astype(np.float32)
@@ -0,0 +1,77 @@
+"""Recall/latency of the IVF gallery against the exact scan on synthetic descriptors.
+
+Run from backend/:  python benchmarks/bench_ann.py --size 50000 --queries 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann import IVFGallery  # noqa: E402
+from recognition import DESCRIPTOR_SIZE, DescriptorGallery  # noqa: E402
+
+
+def synthetic_faces(n: int, rng) -> np.ndarray:
+    """Clustered unit-ish vectors, roughly the shape of face-api.js descriptors."""
+    centres = rng.normal(0, 0.12, size=(max(1, n // 50), DESCRIPTOR_SIZE))
+    faces = centres[rng.integers(0, len(centres), n)] + rng.normal(0, 0.05, size=(n, DESCRIPTOR_SIZE))
+    return faces.astype(np.float32)
+
+
+def timed_search(gallery, queries, k):
+    start = time.perf_counter()
+    results = [gallery.search(q, k=k, threshold=10.0)[0] for q in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=1)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    faces = synthetic_faces(args.size, rng)
+    rows = [(i, f"person {i}", "friend", faces[i]) for i in range(args.size)]
+    picked = rng.integers(0, args.size, args.queries)
+    queries = faces[picked] + rng.normal(0, 0.02, size=(args.queries, DESCRIPTOR_SIZE)).astype(np.float32)
+
+    exact = DescriptorGallery()
+    exact.load(rows)
+    truth, exact_latency = timed_search(exact, queries, args.k)
+    print(f"gallery={args.size} queries={args.queries} k={args.k}")
+    print(f"exact      latency={exact_latency * 1000:.3f} ms/query")
+
+    ivf = IVFGallery(min_train_size=0)
+    start = time.perf_counter()
+    ivf.load(rows)
+    print(f"ivf build  {time.perf_counter() - start:.2f} s ({len(ivf._centroids)} lists)")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        found, latency = timed_search(ivf, queries, args.k)
+        hits = sum(
+            len({m["id"] for m in f} & {m["id"] for m in t}) for f, t in zip(found, truth)
+        )
+        recall = hits / sum(len(t) for t in truth)
+        print(
+            f"ivf nprobe={nprobe:<3} latency={latency * 1000:.3f} ms/query "
+            f"recall@{args.k}={recall:.3f} speedup={exact_latency / latency:.1f}x"
+        )
+
+    # Enrolment between searches: each edit patches one inverted list, so searches stay as fast.
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        ivf.upsert(i, f"person {i}", "friend", faces[(i + 1) % args.size])
+        ivf.search(query, k=args.k, threshold=10.0)
+    latency = (time.perf_counter() - start) / len(queries)
+    print(f"ivf nprobe={ivf.nprobe:<3} latency={latency * 1000:.3f} ms/(edit + query)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Conversation search latency: the FTS5 index (search.py) vs a LIKE scan over the summaries.
+
+Run from backend/:  python benchmarks/bench_search.py --conversations 100000 --people 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_, select  # noqa: E402
+
+from database import Base, make_engine, migrate_db  # noqa: E402
+from models import Conversation, Person  # noqa: E402
+from search import fts_query, search_statement  # noqa: E402
+
+TOPICS = (
+    "garden tomatoes walk park doctor pills lunch soup church choir grandson birthday cake trip sea "
+    "photos wedding dog cat knitting football radio news weather rain snow market bread tea neighbour "
+    "bus station piano letter phone hospital nurse flowers roses bench library book crossword"
+).split()
+QUERIES = ["garden", "birthday cake", "pian", "doctor pills", "wedding photos", "library crossword"]
+# Filler vocabulary with Zipf-like frequencies, so common words are common and topics are rare-ish.
+FILLER = [f"word{i}" for i in range(5000)]
+FILLER_WEIGHTS = [1 / (rank + 1) for rank in range(len(FILLER))]
+
+
+def summary(rng: random.Random) -> str:
+    words = rng.choices(FILLER, FILLER_WEIGHTS, k=rng.randint(12, 40)) + rng.sample(TOPICS, rng.randint(1, 3))
+    rng.shuffle(words)
+    return " ".join(words).capitalize() + "."
+
+
+def seed(conn, people: int, conversations: int, rng: random.Random):
+    conn.execute(
+        Person.__table__.insert(),
+        [dict(name=f"Person {i:05d}", relationship="friend", with_you_today=False) for i in range(people)],
+    )
+    for start in range(0, conversations, 10_000):
+        conn.execute(
+            Conversation.__table__.insert(),
+            [
+                dict(
+                    person_id=rng.randint(1, people),
+                    date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    summary=summary(rng),
+                    status="ready",
+                )
+                for _ in range(start, min(conversations, start + 10_000))
+            ],
+        )
+
+
+def like_statement(q: str):
+    """What search would be without the index: every word as a LIKE pattern, newest first."""
+    words = q.split()
+    return (
+        select(Conversation.id, Conversation.summary)
+        .join(Person, Person.id == Conversation.person_id)
+        .where(*(or_(Conversation.summary.like(f"%{w}%"), Person.name.like(f"%{w}%")) for w in words))
+        .order_by(Conversation.date.desc())
+    )
+
+
+def timed(conn, stmt, repeat: int) -> tuple[float, int]:
+    times, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(stmt).all())
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=100_000)
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            migrate_db(conn)
+            start = time.perf_counter()
+            seed(conn, args.people, args.conversations, random.Random(7))
+            print(f"seeded {args.conversations} conversations (indexed by triggers) in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':<18} {'fts ms':>8} {'like ms':>8} {'fts hits':>8} {'like hits':>9}")
+        with engine.connect() as conn:
+            for q in QUERIES:
+                fts_ms, fts_rows = timed(conn, search_statement(fts_query(q)).limit(args.limit), args.repeat)
+                like_ms, like_rows = timed(conn, like_statement(q).limit(args.limit), args.repeat)
+                print(f"{q:<18} {fts_ms * 1000:>8.2f} {like_ms * 1000:>8.2f} {fts_rows:>8} {like_rows:>9}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Write throughput with households spread over 1..N SQLite shards (shards.ShardRouter).
+
+Writers spread over several processes (like uvicorn --workers) each commit one conversation per
+transaction to their household. With one shard every process queues on the same file's write lock;
+with more shards the households write in parallel.
+
+Run from backend/:  python benchmarks/bench_shards.py --shards 1 2 4 8 --writers 16 --processes 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from database import SQLITE_PROFILES  # noqa: E402
+from models import Conversation, Person  # noqa: E402
+from shards import ShardRouter  # noqa: E402
+
+
+async def writer(router: ShardRouter, household: str, person_id: int, deadline: float, counts: dict):
+    while time.perf_counter() < deadline:
+        async with router.session(household) as db:
+            try:
+                db.add(Conversation(person_id=person_id, date="2024-02-01", summary="New visit."))
+                await db.commit()
+                counts["commits"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+
+async def seed(router: ShardRouter, households: list[str]) -> dict:
+    person_ids = {}
+    for household in households:
+        async with router.session(household) as db:
+            person = Person(name="Person", relationship="friend", with_you_today=False)
+            db.add(person)
+            await db.commit()
+            person_ids[household] = person.id
+    await router.close()
+    return person_ids
+
+
+async def run_writers(router: ShardRouter, assignments: list[tuple[str, int]], seconds: float) -> dict:
+    counts = {"commits": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(writer(router, household, pid, deadline, counts) for household, pid in assignments))
+    await router.close()
+    return {**counts, "evicted": router.evicted}
+
+
+def process_main(job: tuple) -> dict:
+    """One worker process (like one uvicorn worker) with its own router over the shared directory."""
+    directory, max_open, pool_size, profile, assignments, seconds = job
+    router = ShardRouter(directory, max_open=max_open, pool_size=pool_size, profile=profile)
+    return asyncio.run(run_writers(router, assignments, seconds))
+
+
+def run(shard_count: int, writers: int, processes: int, seconds: float, max_open: int, profile: str) -> dict:
+    with tempfile.TemporaryDirectory(dir=os.getcwd()) as directory:  # the real disk, not a tmpfs
+        households = [f"bench{i}" for i in range(shard_count)]
+        pool_size = max(1, writers // shard_count)
+        person_ids = asyncio.run(seed(ShardRouter(directory, pool_size=pool_size, profile=profile), households))
+        assignments = [(households[i % shard_count], person_ids[households[i % shard_count]]) for i in range(writers)]
+        jobs = [
+            (directory, max_open, pool_size, profile, assignments[p::processes], seconds) for p in range(processes)
+        ]
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(process_main, jobs)
+        return {key: sum(r[key] for r in results) for key in ("commits", "errors", "evicted")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=4, help="worker processes sharing the shard directory")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument("--max-open", type=int, default=32, help="engine LRU size (below --shards forces evictions)")
+    args = parser.parse_args()
+
+    print(f"{'profile':<10} {'shards':>6} {'procs':>5} {'writers':>7} {'commits/s':>10} {'errors':>6} {'evicted':>7}")
+    for profile in args.profiles:
+        for shard_count in args.shards:
+            result = run(shard_count, args.writers, args.processes, args.seconds, args.max_open, profile)
+            rate = result["commits"] / args.seconds
+            print(
+                f"{profile:<10} {shard_count:>6} {args.processes:>5} {args.writers:>7} {rate:>10.0f}"
+                f" {result['errors']:>6} {result['evicted']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
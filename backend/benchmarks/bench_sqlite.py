@@ -0,0 +1,118 @@
+"""Mixed read/write throughput of the SQLite profiles in database.SQLITE_PROFILES.
+
+Run from backend/:  python benchmarks/bench_sqlite.py --seconds 5 --readers 8 --writers 2
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import SQLITE_PROFILES, Base, make_engine  # noqa: E402
+from models import Conversation, Person  # noqa: E402
+
+
+def seed(Session, people: int):
+    db = Session()
+    db.add_all(Person(name=f"Person {i:05d}", relationship="friend", with_you_today=False) for i in range(people))
+    db.commit()
+    ids = [p for (p,) in db.query(Person.id)]
+    db.add_all(
+        Conversation(person_id=random.choice(ids), date=f"2024-01-{i % 28 + 1:02d}", summary=f"Talked about item {i}.")
+        for i in range(people * 5)
+    )
+    db.commit()
+    db.close()
+    return ids
+
+
+def reader(Session, ids, stop, latencies, errors):
+    while not stop.is_set():
+        start = time.perf_counter()
+        db = Session()
+        try:
+            db.query(Person).order_by(Person.name).limit(50).all()
+            pid = random.choice(ids)
+            db.query(Conversation).filter(Conversation.person_id == pid).order_by(Conversation.date.desc()).all()
+        except OperationalError:
+            errors.append(1)
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - start)
+
+
+def writer(Session, ids, stop, latencies, errors):
+    while not stop.is_set():
+        start = time.perf_counter()
+        db = Session()
+        try:
+            pid = random.choice(ids)
+            db.add(Conversation(person_id=pid, date="2024-02-01", summary="New visit."))
+            db.query(Person).filter(Person.id == pid).update({"with_you_today": True})
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            errors.append(1)
+        finally:
+            db.close()
+        latencies.append(time.perf_counter() - start)
+
+
+def run(profile: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        ids = seed(Session, args.people)
+        stop = threading.Event()
+        reads, writes, errors = [], [], []
+        threads = [threading.Thread(target=reader, args=(Session, ids, stop, reads, errors)) for _ in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(Session, ids, stop, writes, errors)) for _ in range(args.writers)]
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 20 else float("nan")
+
+    return {
+        "profile": profile,
+        "reads_per_s": len(reads) / args.seconds,
+        "writes_per_s": len(writes) / args.seconds,
+        "read_p95_ms": p95(reads),
+        "write_p95_ms": p95(writes),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s, {args.people} people")
+    for profile in args.profiles:
+        r = run(profile, args)
+        print(
+            f"{r['profile']:<11} reads/s={r['reads_per_s']:8.1f} writes/s={r['writes_per_s']:8.1f} "
+            f"read p95={r['read_p95_ms']:7.2f} ms write p95={r['write_p95_ms']:7.2f} ms errors={r['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
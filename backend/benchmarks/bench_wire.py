@@ -0,0 +1,74 @@
+"""Payload size and decode time of the recognition gallery: JSON vs packed f32/f16/i8, with and without gzip.
+
+Run from backend/:  python benchmarks/bench_wire.py --people 500 1000 5000
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wire  # noqa: E402
+from recognition import DESCRIPTOR_SIZE, MATCH_THRESHOLD  # noqa: E402
+from schemas import PersonForRecognition  # noqa: E402
+from benchmarks.bench_ann import synthetic_faces  # noqa: E402
+
+
+def best_time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def match_agreement(exact: np.ndarray, approx: np.ndarray, queries: np.ndarray) -> float:
+    """Share of queries whose best match (or no-match) is unchanged by quantization."""
+
+    def best(matrix):
+        d = np.sqrt(((queries[:, None, :] - matrix[None, :, :]) ** 2).sum(axis=2))
+        idx = d.argmin(axis=1)
+        return np.where(d[np.arange(len(queries)), idx] < MATCH_THRESHOLD, idx, -1)
+
+    return float((best(exact) == best(approx)).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, nargs="+", default=[500, 1000, 5000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"{'people':>6} {'format':<6} {'bytes':>10} {'gzip':>10} {'decode ms':>10} {'max err':>9} {'same match':>10}")
+    for n in args.people:
+        faces = synthetic_faces(n, rng)
+        people = [{"id": i + 1, "name": f"Person {i:05d}", "relationship": "friend"} for i in range(n)]
+        picked = rng.integers(0, n, args.queries)
+        queries = faces[picked] + rng.normal(0, 0.02, size=(args.queries, DESCRIPTOR_SIZE)).astype(np.float32)
+
+        # What /api/people/for-recognition serves today: floats of the stored float32 values, as JSON.
+        as_json = json.dumps(
+            [PersonForRecognition(**p, face_descriptor=f.tolist()).model_dump() for p, f in zip(people, faces)]
+        ).encode("utf-8")
+        decode = best_time(lambda: np.asarray([p["face_descriptor"] for p in json.loads(as_json)], np.float32))
+        print(f"{n:>6} {'json':<6} {len(as_json):>10} {len(gzip.compress(as_json, 6)):>10} {decode * 1000:>10.2f}")
+
+        for dtype in wire.DTYPES:
+            body = wire.encode_gallery({"version": 1, "full": True, "deleted": [], "people": people}, faces, DESCRIPTOR_SIZE, dtype)
+            _, matrix = wire.decode_gallery(body)
+            decode = best_time(lambda: wire.decode_gallery(body))
+            print(
+                f"{n:>6} {dtype:<6} {len(body):>10} {len(gzip.compress(body, 6)):>10} {decode * 1000:>10.2f}"
+                f" {float(np.abs(matrix - faces).max()):>9.5f} {match_agreement(faces, matrix, queries):>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
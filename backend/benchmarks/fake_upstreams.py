@@ -0,0 +1,113 @@
+"""Local stand-ins for the Groq chat-completions and ElevenLabs TTS APIs, for offline load tests.
+
+Run from backend/:  python benchmarks/fake_upstreams.py --port 8901 --groq-latency 0.4 --groq-error-rate 0.05
+then start the app with GROQ_BASE_URL=http://127.0.0.1:8901/groq and
+ELEVENLABS_BASE_URL=http://127.0.0.1:8901/elevenlabs (any API keys).
+
+Latencies are the mean time to the first byte, with +/-25% uniform jitter. Errors are 500s
+returned at the given rate. GET /stats returns the calls served so far.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+SENTENCES = [
+    "I'm right here with you.",
+    "Everything is okay.",
+    "Let's take a slow breath together.",
+    "You're at home, and you're not alone.",
+    "Tell me what's on your mind.",
+    "Your family knows where you are.",
+    "We can sit quietly for a moment.",
+]
+AUDIO_CHUNK = 4096
+AUDIO_BYTES = 24 * 1024  # about 1.5 s of 128 kbit/s MP3
+
+
+def make_app(groq_latency: float, groq_error_rate: float, tts_latency: float, tts_error_rate: float) -> FastAPI:
+    app = FastAPI(title="Fake Groq/ElevenLabs")
+    stats = {"groq": 0, "groq_errors": 0, "tts": 0, "tts_errors": 0}
+
+    async def delay(mean: float):
+        if mean > 0:
+            await asyncio.sleep(mean * random.uniform(0.75, 1.25))
+
+    def fails(kind: str, rate: float) -> bool:
+        stats[kind] += 1
+        if random.random() < rate:
+            stats[kind + "_errors"] += 1
+            return True
+        return False
+
+    def reply() -> str:
+        # Calm Mode checks the opening says "safe"; vary the rest so replies are not all cache hits.
+        return "\n".join(["You're safe."] + random.sample(SENTENCES, 3))
+
+    @app.post("/groq/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await delay(groq_latency)
+        if fails("groq", groq_error_rate):
+            return JSONResponse({"error": {"message": "fake upstream error"}}, status_code=500)
+        content = reply()
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": content}
+            return {"id": "fake", "model": body.get("model"), "choices": [{"index": 0, "message": message}]}
+
+        async def events():
+            for word in content.split(" "):
+                delta = {"choices": [{"index": 0, "delta": {"content": word + " "}}]}
+                yield f"data: {json.dumps(delta)}\n\n"
+                await asyncio.sleep(0.005)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/elevenlabs/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str):
+        await delay(tts_latency)
+        if fails("tts", tts_error_rate):
+            return JSONResponse({"detail": "fake upstream error"}, status_code=500)
+        return Response(os.urandom(AUDIO_BYTES), media_type="audio/mpeg")
+
+    @app.post("/elevenlabs/text-to-speech/{voice_id}/stream")
+    async def text_to_speech_stream(voice_id: str):
+        await delay(tts_latency)
+        if fails("tts", tts_error_rate):
+            return JSONResponse({"detail": "fake upstream error"}, status_code=500)
+
+        async def chunks():
+            for _ in range(AUDIO_BYTES // AUDIO_CHUNK):
+                yield os.urandom(AUDIO_CHUNK)
+                await asyncio.sleep(0.01)
+
+        return StreamingResponse(chunks(), media_type="audio/mpeg")
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--groq-latency", type=float, default=0.4)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    app = make_app(args.groq_latency, args.groq_error_rate, args.tts_latency, args.tts_error_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
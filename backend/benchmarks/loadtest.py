@@ -0,0 +1,293 @@
+"""Mixed-workload load test of the API against a seeded database and local Groq/ElevenLabs stand-ins.
+
+Starts benchmarks/fake_upstreams.py and the app (uvicorn main:app) as subprocesses on free ports,
+with a fresh database in a temporary directory. It seeds people, conversations and reminders
+through the bulk endpoints, then runs scripted user actions from --concurrency clients for
+--seconds. Latency percentiles and throughput per action are printed and written to --out as JSON,
+for comparing runs.
+
+Run from backend/:  python benchmarks/loadtest.py --people 500 --concurrency 16 --seconds 30 --out loadtest.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from recognition import DESCRIPTOR_SIZE  # noqa: E402
+
+TOPICS = ["garden", "grandson", "doctor", "birthday", "church", "knitting", "football", "market", "piano", "trip"]
+FEELINGS = ["I don't know where I am", "Who are these people?", "I want to go home", "I feel scared", "What day is it?"]
+DEFAULT_MIX = "identify=1,recall=4,calm=2,crud=2,search=1"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: list[str], env: dict, port: int, ready_path: str) -> subprocess.Popen:
+    """Start a server subprocess and wait until `ready_path` answers."""
+    process = subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{args[0]} exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{ready_path}", timeout=1).status_code < 500:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{args[0]} did not start on port {port}")
+
+
+def ndjson(rows) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+async def seed(client: httpx.AsyncClient, people: int, conversations: int, reminders: int, rng: random.Random) -> dict:
+    faces = [[rng.gauss(0, 0.1) for _ in range(DESCRIPTOR_SIZE)] for _ in range(people)]
+    rows = [
+        {"name": f"Person {i:05d}", "relationship": rng.choice(["daughter", "son", "friend", "nurse"]), "face_descriptor": f}
+        for i, f in enumerate(faces)
+    ]
+    r = await client.post("/api/bulk/people", content=ndjson(rows))
+    person_ids = r.json()["ids"]
+    rows = [
+        {
+            "person_id": rng.choice(person_ids),
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "summary": f"Talked about the {rng.choice(TOPICS)} and the {rng.choice(TOPICS)}.",
+        }
+        for _ in range(conversations)
+    ]
+    await client.post("/api/bulk/conversations", content=ndjson(rows))
+    rows = [{"label": f"Reminder {i}", "time": f"{rng.randint(0, 23)}:{rng.randint(0, 59):02d}"} for i in range(reminders)]
+    await client.post("/api/bulk/reminders", content=ndjson(rows))
+    return {"person_ids": person_ids, "faces": dict(zip(person_ids, faces))}
+
+
+async def expect(response_future, *ok_statuses: int) -> httpx.Response:
+    response = await response_future
+    if response.status_code not in (ok_statuses or (200,)):
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+    return response
+
+
+# ---------- Scripted user actions (what the frontend does for each) ----------
+async def identify_bootstrap(client: httpx.AsyncClient, data: dict, rng: random.Random):
+    """Opening Identify: sync the recognition gallery, list people."""
+    await expect(
+        client.get(
+            "/api/recognition/snapshot", params={"dtype": "f16"}, headers={"Accept": "application/octet-stream"}
+        )
+    )
+    await expect(client.get("/api/people", params={"fields": "id,name,relationship"}))
+
+
+async def tap_to_recall(client: httpx.AsyncClient, data: dict, rng: random.Random):
+    """A face is recognized and tapped: match it, show the person and what you last talked about."""
+    person_id = rng.choice(data["person_ids"])
+    query = [v + rng.gauss(0, 0.01) for v in data["faces"][person_id]]
+    match = await expect(client.post("/api/recognize", json={"descriptor": query}))
+    best = (match.json()["results"] or [[]])[0]
+    if not best or best[0]["id"] != person_id:
+        raise RuntimeError(f"recognize did not return person {person_id}")
+    await expect(client.get(f"/api/people/{person_id}"))
+    await expect(client.get(f"/api/people/{person_id}/last-conversation"))
+
+
+async def calm_turn(client: httpx.AsyncClient, data: dict, rng: random.Random):
+    """One Calm Mode exchange: a reply from the LLM, then its audio."""
+    reply = await expect(client.post("/api/calm/reply", json={"user_message": rng.choice(FEELINGS)}))
+    await expect(client.post("/api/calm/speak", json={"text": reply.json()["message"]}), 200, 503)
+
+
+async def crud(client: httpx.AsyncClient, data: dict, rng: random.Random):
+    """Caregiver edits: log a conversation, add, change and remove a reminder."""
+    person_id = rng.choice(data["person_ids"])
+    await expect(
+        client.post(
+            "/api/conversations",
+            json={"person_id": person_id, "date": "2024-06-01", "summary": f"Talked about the {rng.choice(TOPICS)}."},
+        )
+    )
+    reminder = await expect(client.post("/api/reminders", json={"label": "Take pills", "time": "9:00"}))
+    reminder_id = reminder.json()["id"]
+    await expect(client.patch(f"/api/reminders/{reminder_id}", json={"time": "9:30"}))
+    await expect(client.delete(f"/api/reminders/{reminder_id}"))
+
+
+async def search(client: httpx.AsyncClient, data: dict, rng: random.Random):
+    """Searching past conversations."""
+    await expect(client.get("/api/search", params={"q": rng.choice(TOPICS)}))
+
+
+SCENARIOS = {"identify": identify_bootstrap, "recall": tap_to_recall, "calm": calm_turn, "crud": crud, "search": search}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def run_clients(base_url: str, data: dict, mix: dict, concurrency: int, seconds: float, seed_value: int):
+    results = {name: {"latencies": [], "errors": 0, "error_samples": []} for name in mix}
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+        async def user(index: int):
+            rng = random.Random(seed_value + index)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    await SCENARIOS[name](client, data, rng)
+                    results[name]["latencies"].append(time.perf_counter() - start)
+                except (httpx.HTTPError, RuntimeError) as e:
+                    results[name]["errors"] += 1
+                    if len(results[name]["error_samples"]) < 5:
+                        results[name]["error_samples"].append(str(e) or type(e).__name__)
+
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return results
+
+
+def summarize(latencies: list[float], errors: int, seconds: float) -> dict:
+    summary = {"count": len(latencies), "errors": errors, "rps": round(len(latencies) / seconds, 2)}
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        summary.update(
+            mean_ms=round(statistics.fmean(latencies) * 1000, 2),
+            p50_ms=round(cuts[49] * 1000, 2),
+            p95_ms=round(cuts[94] * 1000, 2),
+            p99_ms=round(cuts[98] * 1000, 2),
+            max_ms=round(max(latencies) * 1000, 2),
+        )
+    return summary
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=500)
+    parser.add_argument("--conversations", type=int, default=5000)
+    parser.add_argument("--reminders", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of load before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. recall=4,calm=1")
+    parser.add_argument("--groq-latency", type=float, default=0.4)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    fake_port, app_port = free_port(), free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'loadtest.db')}",
+            "SHARD_DIR": os.path.join(tmp, "shards"),
+            "TTS_CACHE_DIR": os.path.join(tmp, "tts_cache"),
+            "GROQ_API_KEY": "fake",
+            "ELEVENLABS_API_KEY": "fake",
+            "GROQ_BASE_URL": f"{fake_url}/groq",
+            "ELEVENLABS_BASE_URL": f"{fake_url}/elevenlabs",
+        }
+        fake_args = [
+            "benchmarks/fake_upstreams.py",
+            f"--port={fake_port}",
+            f"--groq-latency={args.groq_latency}",
+            f"--groq-error-rate={args.groq_error_rate}",
+            f"--tts-latency={args.tts_latency}",
+            f"--tts-error-rate={args.tts_error_rate}",
+        ]
+        # One worker only: the gallery, reminder schedulers and job recovery live in process memory, so
+        # extra workers would serve empty galleries (fast, wrong answers) and fire every reminder twice.
+        app_args = ["-m", "uvicorn", "main:app", f"--port={app_port}", "--log-level=warning"]
+        processes = [start_server(fake_args, env, fake_port, "/stats")]
+        try:
+            processes.append(start_server(app_args, env, app_port, "/metrics"))
+            base_url = f"http://127.0.0.1:{app_port}"
+            rng = random.Random(args.seed)
+
+            async def run():
+                async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                    start = time.perf_counter()
+                    data = await seed(client, args.people, args.conversations, args.reminders, rng)
+                    print(f"seeded {args.people} people, {args.conversations} conversations in {time.perf_counter() - start:.1f}s")
+                if args.warmup > 0:
+                    await run_clients(base_url, data, mix, args.concurrency, args.warmup, args.seed + 1000)
+                return await run_clients(base_url, data, mix, args.concurrency, args.seconds, args.seed)
+
+            results = asyncio.run(run())
+            upstream_calls = httpx.get(f"{fake_url}/stats").json()
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait(timeout=10)
+
+    scenarios = {name: summarize(r["latencies"], r["errors"], args.seconds) for name, r in results.items()}
+    overall = summarize(
+        [v for r in results.values() for v in r["latencies"]], sum(r["errors"] for r in results.values()), args.seconds
+    )
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "overall": overall,
+        "scenarios": scenarios,
+        "error_samples": {name: r["error_samples"] for name, r in results.items() if r["error_samples"]},
+        "upstream_calls": upstream_calls,
+    }
+
+    print(f"{'scenario':<10} {'count':>7} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, s in [*scenarios.items(), ("overall", overall)]:
+        print(
+            f"{name:<10} {s['count']:>7} {s['errors']:>6} {s['rps']:>8.1f}"
+            f" {s.get('p50_ms', 0):>8.1f} {s.get('p95_ms', 0):>8.1f} {s.get('p99_ms', 0):>8.1f}"
+        )
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
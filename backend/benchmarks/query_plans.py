@@ -0,0 +1,129 @@
+"""EXPLAIN QUERY PLAN audit of the hot queries; exits 1 if any of them scans a table or sorts.
+
+Run from backend/:  python benchmarks/query_plans.py [--verbose]
+
+The statements are built the same way the endpoints in main.py build them (keyset helpers,
+column projection), against an empty schema created from models.py. Without ANALYZE data SQLite
+plans for large tables, so a missing or unusable index shows up as "SCAN <table>" or
+"USE TEMP B-TREE FOR ORDER BY". A "SCAN ... VIRTUAL TABLE INDEX" is an FTS5 index lookup.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from database import Base, make_engine, migrate_db  # noqa: E402
+from main import (  # noqa: E402
+    CONVERSATION_EXPORT_KEYS,
+    CONVERSATION_PAGE_KEYS,
+    PERSON_FIELD_COLUMNS,
+    PERSON_PAGE_KEYS,
+    REMINDER_PAGE_KEYS,
+    CONTACT_PAGE_KEYS,
+)
+from models import Conversation, EmergencyContact, Job, Person, PersonTombstone, Photo, Reminder  # noqa: E402
+from pagination import encode_cursor, paginate, select_columns  # noqa: E402
+from schemas import ConversationResponse, EmergencyContactResponse, PersonResponse, ReminderResponse  # noqa: E402
+from search import fts_query, search_statement  # noqa: E402
+
+
+def hot_queries() -> dict:
+    person_columns = select_columns(Person, PersonResponse, None, PERSON_FIELD_COLUMNS, required=PERSON_PAGE_KEYS)
+    conversation_columns = select_columns(Conversation, ConversationResponse, None, required=CONVERSATION_PAGE_KEYS)
+    by_person = select(*conversation_columns).where(Conversation.person_id == 1)
+    # Export pages (_export_pages): every column of the table, EXPORT_PAGE_SIZE rows after a cursor.
+    export_conversations = select(
+        *select_columns(Conversation, ConversationResponse, None, required=CONVERSATION_EXPORT_KEYS)
+    )
+    export_reminders = select(*select_columns(Reminder, ReminderResponse, None, required=REMINDER_PAGE_KEYS))
+    export_contacts = select(
+        *select_columns(EmergencyContact, EmergencyContactResponse, None, required=CONTACT_PAGE_KEYS)
+    )
+    return {
+        "list people (first page)": paginate(select(*person_columns), PERSON_PAGE_KEYS, None, 50),
+        "list people (next page)": paginate(select(*person_columns), PERSON_PAGE_KEYS, encode_cursor(["M", 10]), 50),
+        "people for recognition": select(Person)
+        .where(Person.face_descriptor_f32.isnot(None))
+        .order_by(Person.name),
+        "recognition changes since": select(Person.id).where(Person.gallery_version > 10),
+        "recognition deletes since": select(PersonTombstone.person_id).where(PersonTombstone.gallery_version > 10),
+        "get person": select(Person).where(Person.id == 1),
+        "person photo": select(Photo).where(Photo.hash == "0" * 64),
+        "photo still referenced": select(Person.id).where(Person.photo_hash == "0" * 64, Person.id != 1).limit(1),
+        "list conversations (first page)": paginate(by_person, CONVERSATION_PAGE_KEYS, None, 20, descending=True),
+        "list conversations (next page)": paginate(
+            by_person, CONVERSATION_PAGE_KEYS, encode_cursor(["2024-01-01", 10]), 20, descending=True
+        ),
+        "last conversation": select(Conversation)
+        .join(Person, Person.last_conversation_id == Conversation.id)
+        .where(Person.id == 1),
+        "last conversations (batch)": select(Conversation)
+        .join(Person, Person.last_conversation_id == Conversation.id)
+        .where(Person.id.in_([1, 2, 3])),
+        "search conversations": search_statement(fts_query("garden tomat")).limit(21),
+        "search one person's conversations": search_statement(fts_query("garden"), [1, 2]).limit(21),
+        "list reminders": paginate(select(Reminder), REMINDER_PAGE_KEYS, None, 50),
+        "enabled reminders": select(Reminder).where(Reminder.enabled.is_(True)).order_by(Reminder.time),
+        "list emergency contacts": paginate(select(EmergencyContact), CONTACT_PAGE_KEYS, None, 50),
+        "export people (next page)": paginate(select(*person_columns), PERSON_PAGE_KEYS, encode_cursor(["M", 10]), 500),
+        "export conversations (next page)": paginate(
+            export_conversations, CONVERSATION_EXPORT_KEYS, encode_cursor([500]), 500
+        ),
+        "export reminders (next page)": paginate(
+            export_reminders, REMINDER_PAGE_KEYS, encode_cursor(["08:00", 10]), 500
+        ),
+        "export emergency contacts (next page)": paginate(
+            export_contacts, CONTACT_PAGE_KEYS, encode_cursor([0, 10]), 500
+        ),
+        "claim job": select(Job.id)
+        .where(Job.status == "pending", Job.run_after <= time.time())
+        .order_by(Job.run_after)
+        .limit(3),
+        "next job due": select(func.min(Job.run_after)).where(Job.status == "pending"),
+    }
+
+
+def problems(plan: list[str]) -> list[str]:
+    """Plan lines that mean a full table scan or an extra sort step."""
+    bad = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and " USING " not in detail and " VIRTUAL TABLE INDEX " not in detail:
+            bad.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            bad.append(detail)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'plans.db')}")
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn)
+            migrate_db(conn)  # triggers and the FTS table are created here, not by create_all
+        failures = 0
+        with engine.connect() as conn:
+            for name, stmt in hot_queries().items():
+                sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+                plan = [row[3] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+                bad = problems(plan)
+                failures += bool(bad)
+                if bad or args.verbose:
+                    print(f"{'FAIL' if bad else 'ok  '}  {name}")
+                    for detail in plan:
+                        print(f"        {detail}")
+        engine.dispose()
+    print(f"{failures} of {len(hot_queries())} hot queries regressed" if failures else "all hot queries use indexes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""NDJSON (one JSON object per line) parsing and encoding for the bulk import/export endpoints."""
+import json
+
+from pydantic import ValidationError
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def parse_row(raw: bytes, schema):
+    """Validated `schema` instance, or a one-line error message."""
+    try:
+        return schema.model_validate_json(raw)
+    except ValidationError as e:
+        return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+
+
+async def ndjson_rows(chunks, schema):
+    """Yield (line number, model or error message) per non-blank line of a streamed NDJSON body."""
+    buffer = b""
+    line = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw in complete:
+            line += 1
+            if raw.strip():
+                yield line, parse_row(raw, schema)
+    if buffer.strip():
+        yield line + 1, parse_row(buffer, schema)
+
+
+def ndjson_line(kind: str, data: dict) -> str:
+    return json.dumps({"type": kind, **data}, separators=(",", ":"), default=str) + "\n"
@@ -0,0 +1,24 @@
+"""gzip for compressible responses, leaving streams, media and range responses untouched."""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+# Event streams must reach the client as they are written, and audio/images are already compressed.
+UNCOMPRESSED_TYPES = ("text/event-stream", "audio/", "image/")
+
+
+class _SelectiveGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message):
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if message["status"] == 206 or content_type.startswith(UNCOMPRESSED_TYPES):
+                self.content_encoding_set = True  # GZipResponder then passes the body through as-is
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = _SelectiveGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
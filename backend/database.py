@@ -1,34 +1,206 @@
-"""SQLite database setup for Remember Me MVP."""
-import sqlite3
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker, declarative_base
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./remember_me.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
-
-
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    """Enable foreign keys so CASCADE deletes work in SQLite."""
-    if isinstance(dbapi_connection, sqlite3.Connection):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+"""Database setup for Remember Me MVP (async SQLAlchemy; SQLite locally, Postgres-ready)."""
+import json
+import os
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Sync-style URL; the async driver is derived from it (sqlite -> aiosqlite, postgresql -> asyncpg)
+# unless ASYNC_DATABASE_URL is given, e.g. postgresql+asyncpg://user:pass@db/remember_me.
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./remember_me.db")
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL")
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+# "production": WAL (readers never wait for the writer), synchronous=NORMAL (no fsync per commit
+# in WAL mode; still crash-safe), memory-mapped reads, a larger page cache and a busy timeout
+# instead of immediate "database is locked" errors. "compat": SQLite defaults (rollback journal).
+DB_PROFILE = os.environ.get("DB_PROFILE", "production")
+SQLITE_PROFILES = {
+    "compat": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.environ.get("DB_CACHE_SIZE_KB", "65536")),  # negative = KiB
+        "busy_timeout": int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000")),
+        "temp_store": "MEMORY",
+    },
+}
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+
+
+def async_url(url: str) -> str:
+    """Async driver URL for a plain database URL (URLs that already name a driver are kept)."""
+    parsed = make_url(url)
+    return str(parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)))
+
+
+def _engine_options(url: str, profile: str, pool_size: int = DB_POOL_SIZE) -> tuple[dict, dict]:
+    """(create_engine kwargs, SQLite pragmas) shared by the sync and async engines."""
+    options = {"pool_size": pool_size, "max_overflow": pool_size}
+    if make_url(url).get_backend_name() != "sqlite":
+        return {**options, "pool_pre_ping": True}, {}
+    pragmas = SQLITE_PROFILES[profile]
+    connect_args = {"check_same_thread": False, "timeout": pragmas.get("busy_timeout", 5000) / 1000}
+    return {**options, "connect_args": connect_args}, pragmas
+
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URL, profile: str = DB_PROFILE):
+    """Sync engine, for scripts and benchmarks; the app itself uses make_async_engine."""
+    options, pragmas = _engine_options(url, profile)
+    new_engine = create_engine(url, **options)
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(new_engine, "connect", lambda conn, record: set_sqlite_pragma(conn, record, pragmas))
+    return new_engine
+
+
+def make_async_engine(url: str = SQLALCHEMY_DATABASE_URL, profile: str = DB_PROFILE, pool_size: int = DB_POOL_SIZE):
+    """Engine used by the app; SQLite pragmas are applied on each new driver connection."""
+    options, pragmas = _engine_options(url, profile, pool_size)
+    if make_url(url).get_backend_name() == "sqlite":
+        options["poolclass"] = AsyncAdaptedQueuePool  # aiosqlite defaults to NullPool; keep connections warm
+    target = ASYNC_DATABASE_URL if ASYNC_DATABASE_URL and url == SQLALCHEMY_DATABASE_URL else async_url(url)
+    new_engine = create_async_engine(target, **options)
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", lambda conn, record: set_sqlite_pragma(conn, record, pragmas))
+    return new_engine
+
+
+def set_sqlite_pragma(dbapi_connection, connection_record, pragmas=None):
+    """Enable foreign keys so CASCADE deletes work in SQLite, then apply the profile's pragmas."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    for name, value in (pragmas or {}).items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+engine = make_async_engine()
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def data_path(suffix: str) -> str:
+    """Path of a sidecar file next to the database file, e.g. data_path(".ivf.npz")."""
+    return os.path.splitext(engine.url.database or "remember_me.db")[0] + suffix
+
+
+async def init_db(db_engine=engine):
+    """Create missing tables and run migrations (on the main database unless another engine is given)."""
+    async with db_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate_db)
+
+
+def migrate_db(conn):
+    """Bring an existing database up to the current models (additive changes only)."""
+    _add_missing_columns(conn)
+    _add_missing_indexes(conn)
+    _pack_json_descriptors(conn)
+    _move_inline_photos(conn)
+    _backfill_last_conversation(conn)
+    _seed_counters(conn)
+    _create_search_index(conn)
+
+
+def _add_missing_columns(conn):
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+            if column.server_default is not None:
+                default = column.server_default.arg
+                if isinstance(default, str):
+                    default = "'" + default.replace("'", "''") + "'"
+                ddl += f" DEFAULT {default}"
+            conn.execute(text(ddl))
+
+
+def _add_missing_indexes(conn):
+    """create_all skips tables that already exist, so new indexes on old tables are created here."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _pack_json_descriptors(conn):
+    """Move JSON text descriptors into the packed float32 column and clear the text copy.
+
+    Unreadable descriptors, or ones of the wrong length, are dropped: the person stays, unrecognizable.
+    """
+    from recognition import pack_descriptor
+
+    rows = conn.execute(
+        text("SELECT id, face_descriptor FROM people WHERE face_descriptor IS NOT NULL AND face_descriptor_f32 IS NULL")
+    ).fetchall()
+    for person_id, raw in rows:
+        try:
+            blob = pack_descriptor(json.loads(raw))
+        except (TypeError, ValueError):  # includes JSONDecodeError
+            blob = None
+        conn.execute(
+            text("UPDATE people SET face_descriptor_f32 = :blob, face_descriptor = NULL WHERE id = :id"),
+            {"blob": blob, "id": person_id},
+        )
+
+
+def _move_inline_photos(conn):
+    """Move legacy base64 photos into the content-addressed photos table (with thumbnails)."""
+    from photos import content_hash, decode_base64_photo, make_thumbnail, sniff_mime
+
+    rows = conn.execute(
+        text("SELECT id, photo_base64 FROM people WHERE photo_base64 IS NOT NULL AND photo_hash IS NULL")
+    ).fetchall()
+    for person_id, photo_base64 in rows:
+        try:
+            data = decode_base64_photo(photo_base64)
+        except ValueError:
+            data = None
+        digest = None
+        if data:
+            digest = content_hash(data)
+            exists = conn.execute(text("SELECT 1 FROM photos WHERE hash = :hash"), {"hash": digest}).first()
+            if not exists:
+                conn.execute(
+                    text(
+                        "INSERT INTO photos (hash, mime, data, thumb, created_at) "
+                        "VALUES (:hash, :mime, :data, :thumb, CURRENT_TIMESTAMP)"
+                    ),
+                    {"hash": digest, "mime": sniff_mime(data), "data": data, "thumb": make_thumbnail(data)},
+                )
+        conn.execute(
+            text("UPDATE people SET photo_hash = :hash, photo_base64 = NULL WHERE id = :id"),
+            {"hash": digest, "id": person_id},
+        )
+
+
+def _backfill_last_conversation(conn):
+    """Point people.last_conversation_id at each person's newest conversation where it is unset."""
+    conn.execute(
+        text(
+            "UPDATE people SET last_conversation_id = ("
+            "SELECT c.id FROM conversations c WHERE c.person_id = people.id ORDER BY c.date DESC, c.id DESC LIMIT 1"
+            ") WHERE last_conversation_id IS NULL"
+        )
+    )
+
+
+def _seed_counters(conn):
+    if conn.execute(text("SELECT 1 FROM counters WHERE name = 'gallery'")).first() is None:
+        conn.execute(text("INSERT INTO counters (name, value) VALUES ('gallery', 0)"))
+
+
+def _create_search_index(conn):
+    from search import create_search_index
+
+    create_search_index(conn)
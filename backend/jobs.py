@@ -0,0 +1,169 @@
+"""Durable in-process background jobs, persisted in the jobs table."""
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+
+from sqlalchemy import func, select, update
+
+from models import Job
+
+POLL_INTERVAL = 5.0  # seconds; workers also wake immediately on notify()
+MAX_ERROR_BACKOFF = 60.0  # seconds between worker retries while the database keeps failing
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Bounded pool of asyncio workers running jobs stored in the database (via async sessions).
+
+    Jobs are claimed atomically (pending -> running), retried with exponential backoff,
+    and marked failed after `max_attempts`. Jobs left running by a crash are picked up
+    again on start(), so queued work survives restarts.
+    """
+
+    def __init__(self, session_factory, workers: int = 2, max_attempts: int = 5, base_delay: float = 2.0):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._handlers: dict[str, tuple] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    def handler(self, kind: str, on_failure=None):
+        """Register `async fn(payload) -> result` for a job kind; `async on_failure(payload, error)` runs
+        once retries are exhausted."""
+
+        def register(fn):
+            self._handlers[kind] = (fn, on_failure)
+            return fn
+
+        return register
+
+    def enqueue(self, db, kind: str, payload: dict, job_id: str | None = None) -> Job:
+        """Add a job to `db`; it runs once the caller commits and calls notify()."""
+        job = Job(
+            id=job_id or uuid.uuid4().hex,
+            kind=kind,
+            payload=json.dumps(payload),
+            status="pending",
+            attempts=0,
+            max_attempts=self.max_attempts,
+            run_after=time.time(),
+        )
+        db.add(job)
+        return job
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        """Run jobs until cancelled. Errors outside a job (the database is locked or gone) are
+        logged and retried with backoff; a claimed job whose outcome could not be written is
+        handed back to pending before the worker claims anything else."""
+        held: list[str] = []  # id of the claimed job until its outcome is written
+        errors = 0
+        while True:
+            try:
+                if held:
+                    await self._release(held[0])
+                    held.clear()
+                await self._step(held)
+                errors = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                errors += 1
+                delay = min(MAX_ERROR_BACKOFF, self.base_delay * 2 ** (errors - 1))
+                logger.exception("Job worker error, retrying in %.0fs", delay)
+                await asyncio.sleep(delay)
+
+    async def _step(self, held: list[str]):
+        """Claim and run one job, or wait until one is due."""
+        job, wait = await self._claim()
+        if job is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            return
+        job_id, kind, payload, attempts, max_attempts = job
+        held.append(job_id)
+        fn, on_failure = self._handlers.get(kind, (None, None))
+        try:
+            if fn is None:
+                raise LookupError(f"No handler for job kind {kind!r}")
+            result = await fn(payload)
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release(job_id))
+            held.clear()
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempts >= max_attempts:
+                await self._update(job_id, status="failed", result=None, error=error)
+                if on_failure is not None:
+                    await on_failure(payload, error)
+            else:
+                delay = self.base_delay * 2 ** (attempts - 1) * (1 + random.random() / 2)
+                await self._update(job_id, status="pending", error=error, run_after=time.time() + delay)
+        else:
+            await self._update(job_id, status="done", result=json.dumps(result) if result is not None else None, error=None)
+        held.clear()
+
+    async def _recover(self):
+        async with self.session_factory() as db:
+            await db.execute(update(Job).where(Job.status == "running").values(status="pending"))
+            await db.commit()
+
+    async def _claim(self):
+        """Atomically take the oldest due pending job.
+
+        Returns ((id, kind, payload, attempts, max_attempts), 0) or (None, seconds to sleep).
+        """
+        async with self.session_factory() as db:
+            now = time.time()
+            candidates = await db.scalars(
+                select(Job.id)
+                .where(Job.status == "pending", Job.run_after <= now)
+                .order_by(Job.run_after)
+                .limit(self.workers + 1)
+            )
+            for job_id in candidates.all():
+                claimed = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "pending")
+                    .values(status="running", attempts=Job.attempts + 1)
+                )
+                await db.commit()
+                if claimed.rowcount:
+                    job = await db.get(Job, job_id)
+                    return (job.id, job.kind, json.loads(job.payload), job.attempts, job.max_attempts), 0
+            next_due = await db.scalar(select(func.min(Job.run_after)).where(Job.status == "pending"))
+            wait = POLL_INTERVAL if next_due is None else min(POLL_INTERVAL, max(0.0, next_due - now))
+            return None, wait
+
+    async def _update(self, job_id: str, **values):
+        async with self.session_factory() as db:
+            await db.execute(update(Job).where(Job.id == job_id).values(**values))
+            await db.commit()
+
+    async def _release(self, job_id: str):
+        """Hand an interrupted job back without counting the attempt."""
+        await self._update(job_id, status="pending", attempts=Job.attempts - 1)
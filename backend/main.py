@@ -1,27 +1,61 @@
 """Remember Me MVP — FastAPI backend."""
+import asyncio
 import json
+import logging
 import os
-from contextlib import asynccontextmanager
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 
 from dotenv import load_dotenv
 load_dotenv()
 from datetime import date
-from fastapi import FastAPI, Depends, HTTPException
+from typing import Callable
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
-from sqlalchemy.orm import Session
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 import httpx
 
-from database import get_db, init_db
-from models import Person, Conversation, Reminder, EmergencyContact
+from bulk import NDJSON_MEDIA_TYPE, ndjson_line, ndjson_rows
+from compression import SelectiveGZipMiddleware
+from database import AsyncSessionLocal, data_path, get_db as get_main_db, init_db
+from jobs import JobQueue
+from llm_cache import ResponseCache
+from metrics import CALM_FALLBACKS, CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry
+from models import Person, PersonTombstone, Photo, Conversation, Reminder, EmergencyContact, Job, Counter, Setting
+from pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    as_record,
+    decode_cursor,
+    encode_cursor,
+    list_response,
+    next_page,
+    paginate,
+    parse_fields,
+    select_columns,
+)
+from photos import content_hash, decode_base64_photo, encode_base64_photo, make_thumbnail, sniff_mime
 from schemas import (
     PersonCreate,
     PersonUpdate,
     PersonResponse,
     PersonForRecognition,
+    RecognitionSnapshot,
+    RecognizeRequest,
+    RecognizeResponse,
     ConversationCreate,
     ConversationResponse,
+    ConversationSearchHit,
     SummarizeAndSaveRequest,
+    BulkImportResult,
+    BulkRowError,
+    JobResponse,
     ReminderCreate,
     ReminderUpdate,
     ReminderResponse,
@@ -32,15 +66,38 @@ from schemas import (
     CalmReassuranceResponse,
     CalmReplyRequest,
     CalmSpeakRequest,
+    CalmSpeakLinesRequest,
 )
+from recognition import DESCRIPTOR_SIZE, all_finite, make_gallery, pack_descriptor, unpack_descriptor
+from resilience import HEDGE_REQUESTS, CircuitOpenError, first_within, hedged, within
+from scheduler import REMINDER_TZ, ReminderScheduler
+from search import fts_query, search_statement
+from shards import SHARD_HEADER, ShardRouter, check_household_id
+from tts_cache import AudioCache
+from upstream import upstream
+import wire
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_db()
+    await init_db()
+    await main_household.open()
+    await upstream.start()
+    await jobs.start()
+    prewarm = asyncio.create_task(_prewarm_tts())
     yield
-    # shutdown if needed
+    prewarm.cancel()
+    await jobs.stop()
+    await upstream.aclose()
+    for household in (main_household, *households.values()):
+        await household.close()
+    households.clear()
+    await shards.close()
+
 
+GZIP_MIN_BYTES = int(os.environ.get("GZIP_MIN_BYTES", "1024"))
 
 app = FastAPI(
     title="Remember Me API",
@@ -48,103 +105,497 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=6)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
-def descriptor_to_list(desc_str):
-    if not desc_str:
+def descriptor_to_list(desc_blob):
+    """Packed float32 column -> list of floats for JSON responses."""
+    if not desc_blob:
         return None
     try:
-        return json.loads(desc_str)
-    except (json.JSONDecodeError, TypeError):
+        return unpack_descriptor(desc_blob).tolist()
+    except ValueError:
         return None
 
 
-# ---------- People ----------
-@app.get("/api/people", response_model=list[PersonResponse])
-def list_people(db: Session = Depends(get_db)):
-    people = db.query(Person).order_by(Person.name).all()
-    out = []
-    for p in people:
-        d = descriptor_to_list(p.face_descriptor)
-        out.append(
-            PersonResponse(
-                id=p.id,
-                name=p.name,
-                relationship=p.relationship,
-                about=p.about,
-                photo_base64=p.photo_base64,
-                face_descriptor=d,
-                with_you_today=p.with_you_today,
-            )
-        )
-    return out
+jobs = JobQueue(AsyncSessionLocal, workers=int(os.environ.get("JOB_WORKERS", "2")))
+shards = ShardRouter()
 
 
-@app.get("/api/people/for-recognition", response_model=list[PersonForRecognition])
-def list_people_for_recognition(db: Session = Depends(get_db)):
-    """Lightweight list for face recognition (descriptor required)."""
-    people = db.query(Person).filter(Person.face_descriptor.isnot(None)).order_by(Person.name).all()
-    return [
-        PersonForRecognition(
-            id=p.id,
-            name=p.name,
-            relationship=p.relationship,
-            face_descriptor=descriptor_to_list(p.face_descriptor),
+class Household:
+    """Database sessions for one household, plus the in-memory state built from its database.
+
+    The household with id None is the main database (requests without X-Household-Id) and stays loaded;
+    every other household has its own shard and is loaded on first use. At most HOUSEHOLD_MAX_LOADED of
+    those are kept: the least recently used one with no request in flight and no reminder stream open is
+    closed (its reminders fire again once a client opens it). Shard engines come and go through the
+    router's LRU separately.
+    """
+
+    def __init__(self, household_id: str | None = None):
+        self.id = household_id
+        self.in_use = 0  # requests currently holding this household (see get_household)
+        self._forwarding = asyncio.Lock()
+        self.gallery = make_gallery(
+            index_path=data_path(".ivf.npz") if household_id is None else shards.path(household_id, ".ivf.npz")
         )
-        for p in people
+        self.scheduler = ReminderScheduler(on_once_fired=self._disable_reminder)
+
+    @asynccontextmanager
+    async def session(self):
+        async with AsyncSessionLocal() if self.id is None else shards.session(self.id) as db:
+            yield db
+
+    async def open(self):
+        async with self.session() as db:
+            rows = await db.execute(
+                select(Person.id, Person.name, Person.relationship, Person.face_descriptor_f32).where(
+                    Person.face_descriptor_f32.isnot(None)
+                )
+            )
+            people = [(pid, name, rel, unpack_descriptor(desc)) for pid, name, rel, desc in rows]
+            await asyncio.to_thread(self.gallery.load, people)  # an IVF gallery may train its index here
+            tz = None if REMINDER_TZ else await db.get(Setting, REMINDER_TZ_SETTING)
+            if tz is not None:
+                self.scheduler.set_timezone(tz.value)
+            self.scheduler.load((await db.execute(select(Reminder).where(Reminder.enabled.is_(True)))).scalars())
+        self.scheduler.start()
+        await self.forward_jobs()
+
+    async def forward_jobs(self):
+        """Move jobs written to this shard's own jobs table into the queue in the main database.
+
+        Jobs are added to the shard in the transaction that needs them, so a failed move is only retried
+        here (on the next write, or when the household is next opened) instead of losing the job. A job
+        id already in the queue is not added twice.
+        """
+        if self.id is None:
+            return
+        async with self._forwarding, self.session() as db:
+            outbox = (await db.scalars(select(Job))).all()
+            if not outbox:
+                return
+            ids = [job.id for job in outbox]
+            async with AsyncSessionLocal() as main_db:
+                queued = set(await main_db.scalars(select(Job.id).where(Job.id.in_(ids))))
+                for job in outbox:
+                    if job.id not in queued:
+                        jobs.enqueue(main_db, job.kind, json.loads(job.payload), job_id=job.id)
+                await main_db.commit()
+            await db.execute(delete(Job).where(Job.id.in_(ids)))
+            await db.commit()
+        jobs.notify()
+
+    async def close(self):
+        await self.scheduler.stop()
+        self.gallery.save()
+
+    async def adopt_timezone(self, name: str | None):
+        """Fire reminders in the zone of the browser using the app (remembered across restarts),
+        unless REMINDER_TZ pins one."""
+        if REMINDER_TZ or not name or not self.scheduler.set_timezone(name):
+            return
+        async with self.session() as db:
+            await db.merge(Setting(name=REMINDER_TZ_SETTING, value=name))
+            await db.commit()
+
+    async def _disable_reminder(self, reminder_id: int):
+        """A "once" reminder has fired: switch it off so it does not fire again the next day."""
+        async with self.session() as db:
+            await db.execute(update(Reminder).where(Reminder.id == reminder_id).values(enabled=False))
+            await db.commit()
+
+
+REMINDER_TZ_SETTING = "reminder_tz"
+HOUSEHOLD_MAX_LOADED = int(os.environ.get("HOUSEHOLD_MAX_LOADED", "256"))  # shard households kept in memory
+
+main_household = Household()
+households: OrderedDict[str, Household] = OrderedDict()  # least recently used first
+_households_lock = asyncio.Lock()
+
+
+async def _household(household_id: str | None, create: bool = True) -> Household:
+    """The household's state, opening its shard on first use.
+
+    The shard is created if it does not exist yet, unless `create` is False: then an unknown household is a 404.
+    """
+    if household_id is None:
+        return main_household
+    household = households.get(household_id)
+    if household is None:
+        async with _households_lock:
+            household = households.get(household_id)
+            if household is None:
+                if not create and not shards.exists(household_id):
+                    raise HTTPException(status_code=404, detail="Household not found")
+                household = Household(check_household_id(household_id))
+                await household.open()
+                households[household_id] = household
+                await _unload_idle_households(keep=household_id)
+    households.move_to_end(household_id)
+    return household
+
+
+async def _unload_idle_households(keep: str):
+    """Close the least recently used households beyond HOUSEHOLD_MAX_LOADED that nothing is using."""
+    idle = [
+        household_id
+        for household_id, household in households.items()
+        if household_id != keep and not household.in_use and not household.scheduler.subscribed
     ]
+    for household_id in idle[: max(0, len(households) - HOUSEHOLD_MAX_LOADED)]:
+        await households.pop(household_id).close()
 
 
-@app.get("/api/people/{person_id}", response_model=PersonResponse)
-def get_person(person_id: int, db: Session = Depends(get_db)):
-    p = db.query(Person).filter(Person.id == person_id).first()
-    if not p:
-        raise HTTPException(status_code=404, detail="Person not found")
-    return PersonResponse(
+async def get_household(request: Request):
+    # Only requests that add data create a household, so reads cannot fill SHARD_DIR with empty databases.
+    async with _request_household(request, create=request.method in ("POST", "PUT")) as household:
+        yield household
+
+
+async def get_existing_household(request: Request):
+    """For POST requests that only read (recognition): an unknown household is a 404 here too."""
+    async with _request_household(request, create=False) as household:
+        yield household
+
+
+@asynccontextmanager
+async def _request_household(request: Request, create: bool):
+    # ?household= is for clients that cannot set headers, such as EventSource.
+    household = await _household(
+        request.headers.get(SHARD_HEADER) or request.query_params.get("household") or None, create=create
+    )
+    household.in_use += 1  # no await since _household returned, so it cannot have been unloaded meanwhile
+    try:
+        yield household
+    finally:
+        household.in_use -= 1
+
+
+async def get_db(household: Household = Depends(get_household)):
+    async with household.session() as db:
+        yield db
+
+
+def _sync_gallery(household: Household, p: Person):
+    household.gallery.upsert(p.id, p.name, p.relationship, unpack_descriptor(p.face_descriptor_f32))
+
+
+async def _store_photo(db: AsyncSession, photo_base64: str) -> str:
+    """Save an uploaded photo (and its thumbnail) once per content hash; returns the hash."""
+    try:
+        data = decode_base64_photo(photo_base64)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    digest = content_hash(data)
+    if await db.get(Photo, digest) is None:
+        db.add(Photo(hash=digest, mime=sniff_mime(data), data=data, thumb=make_thumbnail(data)))
+        await db.flush()  # so a repeat of the same image later in this transaction finds it
+    return digest
+
+
+async def _release_photo(db: AsyncSession, photo_hash: str | None, person_id: int):
+    """Drop a photo no other person still points at."""
+    if not photo_hash:
+        return
+    in_use = await db.scalar(
+        select(Person.id).where(Person.photo_hash == photo_hash, Person.id != person_id).limit(1)
+    )
+    if not in_use:
+        await db.execute(delete(Photo).where(Photo.hash == photo_hash))
+
+
+def _pack_face_descriptor(descriptor) -> bytes | None:
+    try:
+        return pack_descriptor(descriptor)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _person_data(p, photo_base64: str | None = None, face_descriptor=None) -> dict:
+    photo_url = f"/api/people/{p.id}/photo?v={p.photo_hash[:16]}" if p.photo_hash else None
+    return dict(
         id=p.id,
         name=p.name,
         relationship=p.relationship,
         about=p.about,
-        photo_base64=p.photo_base64,
-        face_descriptor=descriptor_to_list(p.face_descriptor),
+        photo_base64=photo_base64,
+        photo_url=photo_url,
+        thumbnail_url=f"{photo_url}&size=thumb" if photo_url else None,
+        face_descriptor=face_descriptor if face_descriptor is not None else descriptor_to_list(p.face_descriptor_f32),
         with_you_today=p.with_you_today,
     )
 
 
+def _person_response(p: Person, photo_base64: str | None = None, face_descriptor=None) -> PersonResponse:
+    return PersonResponse(**_person_data(p, photo_base64, face_descriptor))
+
+
+def _record_data(record, schema) -> dict:
+    return {field: getattr(record, field, None) for field in schema.model_fields}
+
+
+# Response fields that are not plain columns -> the columns they are built from.
+PERSON_FIELD_COLUMNS = {
+    "photo_base64": [Person.photo_hash],
+    "photo_url": [Person.photo_hash],
+    "thumbnail_url": [Person.photo_hash],
+    "face_descriptor": [Person.face_descriptor_f32],
+}
+PERSON_PAGE_KEYS = (Person.name, Person.id)
+CONVERSATION_PAGE_KEYS = (Conversation.date, Conversation.id)
+REMINDER_PAGE_KEYS = (Reminder.time, Reminder.id)
+CONTACT_PAGE_KEYS = (EmergencyContact.order_priority, EmergencyContact.id)
+CONVERSATION_EXPORT_KEYS = (Conversation.id,)  # primary key order: no index on a global (date, id) order
+PageLimit = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit to return everything")
+PageCursor = Query(None, description=f"Opaque cursor from the previous page's {NEXT_CURSOR_HEADER} header")
+FieldsParam = Query(None, description="Comma-separated response fields to return, e.g. id,name")
+
+
+RECOGNITION_COLUMNS = (Person.id, Person.name, Person.relationship, Person.face_descriptor_f32)
+
+
+def _recognition_entry(p) -> PersonForRecognition:
+    return PersonForRecognition(
+        id=p.id,
+        name=p.name,
+        relationship=p.relationship,
+        face_descriptor=descriptor_to_list(p.face_descriptor_f32),
+    )
+
+
+async def _gallery_version(db: AsyncSession) -> int:
+    return await db.scalar(select(Counter.value).where(Counter.name == "gallery")) or 0
+
+
+async def _bump_gallery_version(db: AsyncSession) -> int:
+    """Next recognition gallery version; the counter row stays write-locked until the caller commits."""
+    await db.execute(
+        update(Counter)
+        .where(Counter.name == "gallery")
+        .values(value=Counter.value + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return await _gallery_version(db)
+
+
+def _gallery_headers(version: int, dtype: str | None) -> dict:
+    """Caching headers; the ETag names the representation (JSON, or binary of a given dtype)."""
+    etag = f'"gallery-{version}-{dtype}"' if dtype else f'"gallery-{version}"'
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+
+
+DtypeParam = Query("f32", pattern="^(f32|f16|i8)$", description="Descriptor precision of the binary format")
+
+
+def _wants_binary(request: Request) -> bool:
+    return wire.MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _binary_gallery(rows, dtype: str, headers: dict, deleted: list[int], **meta) -> Response:
+    """Packed gallery of `rows`. A stored descriptor of the wrong size or with NaN/infinite values (from
+    before those were checked) cannot be matched: that person is sent as deleted, so clients drop any old copy."""
+    people, descriptors, deleted = [], [], list(deleted)
+    for p in rows:
+        descriptor = unpack_descriptor(p.face_descriptor_f32)
+        if descriptor is None or len(descriptor) != DESCRIPTOR_SIZE or not all_finite(descriptor):
+            deleted.append(p.id)
+            continue
+        people.append({"id": p.id, "name": p.name, "relationship": p.relationship})
+        descriptors.append(descriptor)
+    body = wire.encode_gallery({**meta, "deleted": deleted, "people": people}, descriptors, DESCRIPTOR_SIZE, dtype)
+    return Response(content=body, media_type=wire.MEDIA_TYPE, headers=headers)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in header.split(",")]
+
+
+# ---------- People ----------
+@app.get("/api/people", response_model=list[PersonResponse])
+async def list_people(
+    response: Response,
+    include_photos: bool = False,
+    limit: int | None = PageLimit,
+    cursor: str | None = PageCursor,
+    fields: str | None = FieldsParam,
+    db: AsyncSession = Depends(get_db),
+):
+    """People sorted by name. Photos are linked via photo_url/thumbnail_url unless include_photos=true."""
+    selected = parse_fields(fields, PersonResponse)
+    columns = select_columns(Person, PersonResponse, selected, PERSON_FIELD_COLUMNS, required=PERSON_PAGE_KEYS)
+    rows = (await db.execute(paginate(select(*columns), PERSON_PAGE_KEYS, cursor, limit))).all()
+    rows, next_cursor = next_page(rows, PERSON_PAGE_KEYS, limit)
+    people = [as_record(Person, row) for row in rows]
+    photos = {}
+    if include_photos and (selected is None or "photo_base64" in selected):
+        hashes = {p.photo_hash for p in people if p.photo_hash}
+        if hashes:
+            photos = dict((await db.execute(select(Photo.hash, Photo.data).where(Photo.hash.in_(hashes)))).all())
+    items = [_person_data(p, photo_base64=encode_base64_photo(photos.get(p.photo_hash))) for p in people]
+    return list_response(response, PersonResponse, items, selected, next_cursor)
+
+
+@app.get("/api/people/for-recognition", response_model=list[PersonForRecognition])
+async def list_people_for_recognition(
+    request: Request, response: Response, dtype: str = DtypeParam, db: AsyncSession = Depends(get_db)
+):
+    """Lightweight list for face recognition (descriptor required); 304 while the gallery is unchanged.
+
+    Send `Accept: application/octet-stream` for the packed binary format (see wire.py).
+    """
+    version = await _gallery_version(db)
+    binary = _wants_binary(request)
+    headers = _gallery_headers(version, dtype if binary else None)
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    rows = (
+        await db.execute(
+            select(*RECOGNITION_COLUMNS).where(Person.face_descriptor_f32.isnot(None)).order_by(Person.name)
+        )
+    ).all()
+    if binary:
+        return _binary_gallery(rows, dtype, headers, version=version, full=True, deleted=[])
+    response.headers.update(headers)
+    return [_recognition_entry(p) for p in rows]
+
+
+@app.get("/api/recognition/snapshot", response_model=RecognitionSnapshot)
+async def recognition_snapshot(
+    request: Request,
+    response: Response,
+    since: int | None = Query(None, ge=0, description="Version the client already has; omit for everything"),
+    dtype: str = DtypeParam,
+    db: AsyncSession = Depends(get_db),
+):
+    """Versioned recognition gallery: the full set, or only what changed after `since`.
+
+    The version is read before the rows, so a change racing this request is at worst sent twice.
+    Send `Accept: application/octet-stream` for the packed binary format (see wire.py).
+    """
+    version = await _gallery_version(db)
+    binary = _wants_binary(request)
+    headers = _gallery_headers(version, dtype if binary else None)
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if since is None or since > version:  # no state yet, or a client of a database that was reset
+        full = True
+        rows = (
+            await db.execute(
+                select(*RECOGNITION_COLUMNS).where(Person.face_descriptor_f32.isnot(None)).order_by(Person.id)
+            )
+        ).all()
+        deleted = []
+    else:
+        full = False
+        changed = (
+            await db.execute(select(*RECOGNITION_COLUMNS).where(Person.gallery_version > since).order_by(Person.id))
+        ).all()
+        tombstones = await db.scalars(select(PersonTombstone.person_id).where(PersonTombstone.gallery_version > since))
+        rows = [p for p in changed if p.face_descriptor_f32]
+        deleted = [*tombstones, *(p.id for p in changed if not p.face_descriptor_f32)]
+    if binary:
+        return _binary_gallery(rows, dtype, headers, version=version, full=full, deleted=deleted)
+    response.headers.update(headers)
+    return RecognitionSnapshot(
+        version=version, full=full, people=[_recognition_entry(p) for p in rows], deleted=deleted
+    )
+
+
+@app.get("/api/people/last-conversations", response_model=list[ConversationResponse])
+async def get_last_conversations(
+    person_id: list[int] = Query(..., max_length=100), db: AsyncSession = Depends(get_db)
+):
+    """Latest conversation of each given person (e.g. every face in the frame) in one query.
+
+    People without conversations are left out; match results to faces by person_id.
+    """
+    convs = await db.scalars(
+        select(Conversation)
+        .join(Person, Person.last_conversation_id == Conversation.id)
+        .where(Person.id.in_(person_id))
+    )
+    return [ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary, status=c.status) for c in convs]
+
+
+@app.get("/api/people/{person_id}", response_model=PersonResponse)
+async def get_person(person_id: int, db: AsyncSession = Depends(get_db)):
+    p = await db.get(Person, person_id)
+    if not p:
+        raise HTTPException(status_code=404, detail="Person not found")
+    photo = await db.get(Photo, p.photo_hash) if p.photo_hash else None
+    return _person_response(p, photo_base64=encode_base64_photo(photo.data if photo else None))
+
+
+@app.get("/api/people/{person_id}/photo")
+async def get_person_photo(
+    person_id: int,
+    request: Request,
+    size: str = Query("full", pattern="^(full|thumb)$"),
+    v: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Image bytes with ETag/304; URLs carrying the current ?v= hash are cached as immutable."""
+    photo_hash = await db.scalar(select(Person.photo_hash).where(Person.id == person_id))
+    if not photo_hash:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    etag = f'"{photo_hash}-{size}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable"
+        if v and photo_hash.startswith(v)
+        else "no-cache",
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    photo = await db.get(Photo, photo_hash)
+    if size == "thumb" and photo.thumb:
+        return Response(content=photo.thumb, media_type="image/jpeg", headers=headers)
+    return Response(content=photo.data, media_type=photo.mime, headers=headers)
+
+
 @app.post("/api/people", response_model=PersonResponse)
-def create_person(data: PersonCreate, db: Session = Depends(get_db)):
+async def create_person(
+    data: PersonCreate, household: Household = Depends(get_household), db: AsyncSession = Depends(get_db)
+):
     p = Person(
         name=data.name,
         relationship=data.relationship,
         about=data.about,
-        photo_base64=data.photo_base64,
-        face_descriptor=json.dumps(data.face_descriptor) if data.face_descriptor else None,
+        face_descriptor_f32=_pack_face_descriptor(data.face_descriptor),
+        photo_hash=await _store_photo(db, data.photo_base64) if data.photo_base64 else None,
         with_you_today=data.with_you_today,
     )
+    p.gallery_version = await _bump_gallery_version(db)
     db.add(p)
-    db.commit()
-    db.refresh(p)
-    return PersonResponse(
-        id=p.id,
-        name=p.name,
-        relationship=p.relationship,
-        about=p.about,
-        photo_base64=p.photo_base64,
-        face_descriptor=data.face_descriptor,
-        with_you_today=p.with_you_today,
-    )
+    await db.flush()
+    await db.execute(delete(PersonTombstone).where(PersonTombstone.person_id == p.id))  # SQLite may reuse ids
+    await db.commit()
+    await db.refresh(p)
+    _sync_gallery(household, p)
+    return _person_response(p, photo_base64=data.photo_base64, face_descriptor=data.face_descriptor)
 
 
 @app.patch("/api/people/{person_id}", response_model=PersonResponse)
-def update_person(person_id: int, data: PersonUpdate, db: Session = Depends(get_db)):
-    p = db.query(Person).filter(Person.id == person_id).first()
+async def update_person(
+    person_id: int,
+    data: PersonUpdate,
+    household: Household = Depends(get_household),
+    db: AsyncSession = Depends(get_db),
+):
+    p = await db.get(Person, person_id)
     if not p:
         raise HTTPException(status_code=404, detail="Person not found")
     if data.name is not None:
@@ -154,96 +605,242 @@ def update_person(person_id: int, data: PersonUpdate, db: Session = Depends(get_
     if data.about is not None:
         p.about = data.about
     if data.photo_base64 is not None:
-        p.photo_base64 = data.photo_base64
+        old_hash = p.photo_hash
+        p.photo_hash = await _store_photo(db, data.photo_base64)
+        if old_hash != p.photo_hash:
+            await db.flush()
+            await _release_photo(db, old_hash, person_id)
     if data.face_descriptor is not None:
-        p.face_descriptor = json.dumps(data.face_descriptor)
+        p.face_descriptor_f32 = _pack_face_descriptor(data.face_descriptor)
     if data.with_you_today is not None:
         p.with_you_today = data.with_you_today
-    db.commit()
-    db.refresh(p)
-    return get_person(person_id, db)
+    p.gallery_version = await _bump_gallery_version(db)
+    await db.commit()
+    _sync_gallery(household, p)
+    return await get_person(person_id, db)
 
 
 @app.delete("/api/people/{person_id}")
-def delete_person(person_id: int, db: Session = Depends(get_db)):
-    p = db.query(Person).filter(Person.id == person_id).first()
+async def delete_person(
+    person_id: int, household: Household = Depends(get_household), db: AsyncSession = Depends(get_db)
+):
+    p = await db.get(Person, person_id)
     if not p:
         raise HTTPException(status_code=404, detail="Person not found")
     # Delete conversations first (SQLite may not cascade if FKs were added later)
-    db.query(Conversation).filter(Conversation.person_id == person_id).delete()
-    db.delete(p)
-    db.commit()
+    await db.execute(delete(Conversation).where(Conversation.person_id == person_id))
+    photo_hash = p.photo_hash
+    await db.delete(p)
+    await db.merge(PersonTombstone(person_id=person_id, gallery_version=await _bump_gallery_version(db)))
+    await db.flush()
+    await _release_photo(db, photo_hash, person_id)
+    await db.commit()
+    household.gallery.remove(person_id)
     return {"ok": True}
 
 
+# ---------- Recognition ----------
+@app.post("/api/recognize", response_model=RecognizeResponse)
+def recognize(data: RecognizeRequest, household: Household = Depends(get_existing_household)):
+    """Match one or more face descriptors against the in-memory gallery (closest first)."""
+    queries = list(data.descriptors or [])
+    if data.descriptor is not None:
+        queries.insert(0, data.descriptor)
+    if any(len(q) != DESCRIPTOR_SIZE for q in queries):
+        raise HTTPException(status_code=422, detail=f"Descriptors must have {DESCRIPTOR_SIZE} values")
+    if not all_finite(queries):
+        raise HTTPException(status_code=422, detail="Descriptor values must be finite numbers")
+    return RecognizeResponse(results=household.gallery.search(queries, k=data.k, threshold=data.threshold))
+
+
 # ---------- Conversations ----------
+async def _bump_last_conversation(db: AsyncSession, c: Conversation):
+    """Point the person at `c` unless they already have a newer one; runs in the caller's transaction."""
+    current = aliased(Conversation)
+    newer = (
+        select(current.id)
+        .where(current.id == Person.last_conversation_id, tuple_(current.date, current.id) > tuple_(c.date, c.id))
+        .exists()
+    )
+    await db.execute(
+        update(Person)
+        .where(Person.id == c.person_id, ~newer)
+        .values(last_conversation_id=c.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
 @app.get("/api/people/{person_id}/conversations", response_model=list[ConversationResponse])
-def list_conversations(person_id: int, db: Session = Depends(get_db)):
-    convs = db.query(Conversation).filter(Conversation.person_id == person_id).order_by(Conversation.date.desc()).all()
-    return [ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary) for c in convs]
+async def list_conversations(
+    person_id: int,
+    response: Response,
+    limit: int | None = PageLimit,
+    cursor: str | None = PageCursor,
+    fields: str | None = FieldsParam,
+    db: AsyncSession = Depends(get_db),
+):
+    """Newest first."""
+    selected = parse_fields(fields, ConversationResponse)
+    columns = select_columns(Conversation, ConversationResponse, selected, required=CONVERSATION_PAGE_KEYS)
+    stmt = select(*columns).where(Conversation.person_id == person_id)
+    rows = (await db.execute(paginate(stmt, CONVERSATION_PAGE_KEYS, cursor, limit, descending=True))).all()
+    rows, next_cursor = next_page(rows, CONVERSATION_PAGE_KEYS, limit)
+    items = [_record_data(as_record(Conversation, row), ConversationResponse) for row in rows]
+    return list_response(response, ConversationResponse, items, selected, next_cursor)
 
 
 @app.get("/api/people/{person_id}/last-conversation", response_model=ConversationResponse | None)
-def get_last_conversation(person_id: int, db: Session = Depends(get_db)):
-    c = db.query(Conversation).filter(Conversation.person_id == person_id).order_by(Conversation.date.desc()).first()
+async def get_last_conversation(person_id: int, db: AsyncSession = Depends(get_db)):
+    c = await db.scalar(
+        select(Conversation)
+        .join(Person, Person.last_conversation_id == Conversation.id)
+        .where(Person.id == person_id)
+    )
     if not c:
         return None
-    return ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary)
+    return ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary, status=c.status)
 
 
 @app.post("/api/conversations", response_model=ConversationResponse)
-def create_conversation(data: ConversationCreate, db: Session = Depends(get_db)):
-    person = db.query(Person).filter(Person.id == data.person_id).first()
+async def create_conversation(data: ConversationCreate, db: AsyncSession = Depends(get_db)):
+    person = await db.get(Person, data.person_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     c = Conversation(person_id=data.person_id, date=data.date, summary=data.summary)
     db.add(c)
-    db.commit()
-    db.refresh(c)
-    return ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary)
+    await db.flush()
+    await _bump_last_conversation(db, c)
+    await db.commit()
+    await db.refresh(c)
+    return ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary, status=c.status)
 
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_URL = GROQ_BASE_URL + "/chat/completions"
 SUMMARY_MODEL = "llama-3.1-8b-instant"
 
+llm_cache = ResponseCache(
+    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "512")),
+    ttl=float(os.environ.get("LLM_CACHE_TTL_SECONDS", "300")),
+)
 
-def _summarize_transcript(transcript: str) -> str:
-    """Call Groq to produce a 1-2 line reminder of what was talked about (no quoting)."""
+
+async def _groq_chat(
+    messages: list[dict],
+    timeout: float,
+    cache: bool = True,
+    call: str = "chat",
+    hedge: bool = False,
+    accept: Callable[[str], bool] | None = None,
+) -> str:
+    """Text of the first choice of a Groq chat completion ("" if none). Raises httpx errors.
+
+    Identical prompts within the cache TTL are answered from llm_cache unless cache=False; a
+    completion the caller would reject (accept returns False) is not cached.
+    With hedge=True a second request is sent if the first is slower than this call's recent p95.
+    """
+    key = ResponseCache.key(SUMMARY_MODEL, messages) if cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def send():
+        r = await upstream.post(
+            "groq",
+            GROQ_URL,
+            timeout=timeout,
+            call=call,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={"model": SUMMARY_MODEL, "messages": messages},
+        )
+        r.raise_for_status()  # inside, so an error answer never wins a hedge race
+        return r
+
+    r = await hedged(send, upstream.hedge_delay("groq", call) if hedge else None, "groq", call)
+    choices = r.json().get("choices") or []
+    if not choices:
+        return ""
+    content = ((choices[0].get("message") or {}).get("content") or "").strip()
+    if key and content and (accept is None or accept(content)):
+        llm_cache.put(key, content)
+    return content
+
+
+async def _groq_chat_stream(messages: list[dict], timeout: float, call: str = "chat_stream"):
+    """Yield content deltas of a streamed Groq chat completion. Raises httpx errors."""
+    async with upstream.stream(
+        "groq",
+        "POST",
+        GROQ_URL,
+        timeout=timeout,
+        call=call,
+        headers={
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={"model": SUMMARY_MODEL, "messages": messages, "stream": True},
+    ) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            choices = json.loads(payload).get("choices") or []
+            if choices:
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+SUMMARY_CHUNK_CHARS = int(os.environ.get("SUMMARY_CHUNK_CHARS", "8000"))  # longer transcripts are map-reduced
+SUMMARY_CHUNK_OVERLAP = int(os.environ.get("SUMMARY_CHUNK_OVERLAP", "400"))
+if not 0 <= SUMMARY_CHUNK_OVERLAP < SUMMARY_CHUNK_CHARS // 2:
+    # Chunks are cut in their second half, so a larger overlap could advance one character per chunk.
+    raise RuntimeError(
+        f"SUMMARY_CHUNK_OVERLAP ({SUMMARY_CHUNK_OVERLAP}) must be at least 0 and less than half of "
+        f"SUMMARY_CHUNK_CHARS ({SUMMARY_CHUNK_CHARS})"
+    )
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", "4"))  # chunk calls in flight per transcript
+# Cap on the transcript text summarized (bounds Groq calls per transcript); 0 = no limit.
+SUMMARY_MAX_CHARS = int(os.environ.get("SUMMARY_MAX_CHARS", "200000"))
+
+
+async def _summarize_transcript(transcript: str) -> str:
+    """Call Groq to produce a 1-2 line reminder of what was talked about (no quoting).
+
+    Transcripts longer than SUMMARY_CHUNK_CHARS are split into overlapping chunks that are
+    summarized concurrently, then the chunk notes are reduced into the final lines.
+    """
     if not GROQ_API_KEY:
         raise HTTPException(
             status_code=503,
             detail="Groq API key not configured. Set GROQ_API_KEY.",
         )
-    text = (transcript or "").strip()[:8000]
+    text = (transcript or "").strip()
+    if SUMMARY_MAX_CHARS:
+        text = text[:SUMMARY_MAX_CHARS]
     if not text:
         return "No conversation recorded."
-    prompt = (
-        "Below is a conversation. Write exactly 1-2 short lines that remind the reader what they talked about. "
-        "Do NOT quote the conversation word for word. Just state the topic or gist in plain language (e.g. 'Talked about the garden and weekend plans.'). "
-        "Output only those 1-2 lines, nothing else.\n\nConversation:\n"
-    ) + text
     try:
-        with httpx.Client(timeout=30.0) as client:
-            r = client.post(
-                GROQ_URL,
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": SUMMARY_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            choices = data.get("choices") or []
-            if choices:
-                content = (choices[0].get("message") or {}).get("content") or ""
-                summary = (content or "").strip()
-                if summary:
-                    return summary[:500]
+        source = "a conversation"
+        if len(text) > SUMMARY_CHUNK_CHARS:
+            text = await _summarize_chunks(text)
+            source = "notes taken during a long conversation"
+        prompt = (
+            f"Below is {source}. Write exactly 1-2 short lines that remind the reader what they talked about. "
+            "Do NOT quote the conversation word for word. Just state the topic or gist in plain language (e.g. 'Talked about the garden and weekend plans.'). "
+            "Output only those 1-2 lines, nothing else.\n\nConversation:\n"
+        ) + text
+        summary = await _groq_chat([{"role": "user", "content": prompt}], timeout=30.0, call="summarize")
+        if summary:
+            return summary[:500]
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Groq request failed: {e!s}")
     except Exception as e:
@@ -251,41 +848,230 @@ def _summarize_transcript(transcript: str) -> str:
     return (text[:500] + "...") if len(text) > 500 else text
 
 
-@app.post("/api/conversations/summarize-and-save", response_model=ConversationResponse)
-def summarize_and_save_conversation(
-    data: SummarizeAndSaveRequest, db: Session = Depends(get_db)
+async def _summarize_chunks(text: str) -> str:
+    """Map step: notes for each chunk, in order. Repeats until the notes fit in one chunk."""
+    limit = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+    async def notes_for(i: int, chunk: str, total: int) -> str:
+        prompt = (
+            f"Below is part {i + 1} of {total} of a long conversation. "
+            "In at most 3 short lines, note the topics, plans and people mentioned. "
+            "Do not quote it word for word. Output only the notes.\n\nConversation part:\n"
+        ) + chunk
+        async with limit:
+            return await _groq_chat([{"role": "user", "content": prompt}], timeout=30.0, call="summarize_chunk")
+
+    while len(text) > SUMMARY_CHUNK_CHARS:
+        chunks = _split_transcript(text, SUMMARY_CHUNK_CHARS, SUMMARY_CHUNK_OVERLAP)
+        notes = await asyncio.gather(*(notes_for(i, c, len(chunks)) for i, c in enumerate(chunks)))
+        reduced = "\n".join(n for n in notes if n)
+        if not reduced or len(reduced) >= len(text):  # no progress; keep the head rather than loop
+            return text[:SUMMARY_CHUNK_CHARS]
+        text = reduced
+    return text
+
+
+def _split_transcript(text: str, size: int, overlap: int) -> list[str]:
+    """Chunks of at most `size` chars sharing `overlap` chars, cut at whitespace where possible."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = max(text.rfind("\n", start + size // 2, end), text.rfind(" ", start + size // 2, end))
+            if cut > start:
+                end = cut
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1  # don't open a chunk mid-word
+    return [c for c in chunks if c]
+
+
+@app.post("/api/conversations/summarize-and-save", response_model=ConversationResponse, status_code=202)
+async def summarize_and_save_conversation(
+    data: SummarizeAndSaveRequest, household: Household = Depends(get_household), db: AsyncSession = Depends(get_db)
 ):
-    person = db.query(Person).filter(Person.id == data.person_id).first()
+    """Save a pending conversation now and summarize it in the background (poll /api/jobs/{job_id})."""
+    person = await db.get(Person, data.person_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
-    summary = _summarize_transcript(data.transcript)
+    if not GROQ_API_KEY:
+        raise HTTPException(
+            status_code=503,
+            detail="Groq API key not configured. Set GROQ_API_KEY.",
+        )
     today = date.today().isoformat()
-    c = Conversation(person_id=data.person_id, date=today, summary=summary)
+    c = Conversation(person_id=data.person_id, date=today, summary=PENDING_SUMMARY, status="pending")
     db.add(c)
-    db.commit()
-    db.refresh(c)
-    return ConversationResponse(id=c.id, person_id=c.person_id, date=c.date, summary=c.summary)
+    await db.flush()
+    await _bump_last_conversation(db, c)
+    payload = {"conversation_id": c.id, "transcript": data.transcript, "household": household.id}
+    job = jobs.enqueue(db, "summarize_conversation", payload)  # committed together with the conversation
+    await db.commit()
+    try:
+        await household.forward_jobs()  # a shard's job still has to reach the queue in the main database
+    except SQLAlchemyError:
+        logger.exception("Could not queue the summary of conversation %s yet; retried later", c.id)
+    jobs.notify()
+    return ConversationResponse(
+        id=c.id, person_id=c.person_id, date=c.date, summary=c.summary, status=c.status, job_id=job.id
+    )
+
+
+PENDING_SUMMARY = "Summarizing..."
+
+
+async def _save_summary(conversation_id: int, summary: str, status: str, household_id: str | None) -> dict | None:
+    async with (await _household(household_id)).session() as db:
+        c = await db.get(Conversation, conversation_id)
+        if c is None:  # person deleted meanwhile
+            return None
+        c.summary = summary
+        c.status = status
+        await db.commit()
+        return ConversationResponse(
+            id=c.id, person_id=c.person_id, date=c.date, summary=c.summary, status=c.status
+        ).model_dump()
+
+
+@jobs.handler(
+    "summarize_conversation",
+    on_failure=lambda payload, error: _save_summary(
+        payload["conversation_id"], _trim_transcript(payload["transcript"]), "failed", payload.get("household")
+    ),
+)
+async def _run_summarize_job(payload: dict) -> dict | None:
+    summary = await _summarize_transcript(payload["transcript"])
+    return await _save_summary(payload["conversation_id"], summary, "ready", payload.get("household"))
+
+
+def _trim_transcript(transcript: str) -> str:
+    """Stand-in summary when summarization gives up: the start of the transcript itself."""
+    text = (transcript or "").strip()
+    if not text:
+        return "No conversation recorded."
+    return (text[:500] + "...") if len(text) > 500 else text
+
+
+@app.get("/api/llm-cache/stats")
+def llm_cache_stats():
+    """Hit/miss counters of the shared Groq response cache."""
+    return llm_cache.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Request, SQL, upstream and Calm Mode fallback metrics in the Prometheus text format."""
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_main_db)):  # one queue for all households
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+    )
+
+
+# ---------- Search ----------
+SEARCH_PAGE_SIZE = 20
+
+
+@app.get("/api/search", response_model=list[ConversationSearchHit])
+async def search_conversations(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find; the last may be a prefix"),
+    person_id: list[int] | None = Query(None, max_length=100, description="Only these people's conversations"),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = PageCursor,
+    db: AsyncSession = Depends(get_db),
+):
+    """Conversations whose summary, person name or relationship match `q`, best match first.
+
+    Backed by the conversation_fts index (see search.py). The cursor is an offset rather than a
+    keyset, because scores shift as conversations are added.
+    """
+    if db.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search needs the SQLite FTS5 index")
+    query = fts_query(q)
+    if query is None:
+        raise HTTPException(status_code=422, detail="Search needs at least one word")
+    offset = decode_cursor(cursor, 1)[0] if cursor else 0
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = (await db.execute(search_statement(query, person_id).offset(offset).limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([offset + limit])
+    return [
+        ConversationSearchHit(
+            id=r.id,
+            person_id=r.person_id,
+            person_name=r.person_name,
+            relationship=r.relationship,
+            date=r.date,
+            snippet=r.snippet,
+            score=-r.rank,
+        )
+        for r in rows
+    ]
 
 
 # ---------- Reminders ----------
+REMINDER_STREAM_KEEPALIVE = 15.0  # seconds between comment lines, so proxies keep the stream open
+
+
+def _schedule_reminder(household: Household, r):
+    household.scheduler.upsert(r.id, r.label, r.time, r.repeat_rule, r.enabled)
+
+
 @app.get("/api/reminders", response_model=list[ReminderResponse])
-def list_reminders(db: Session = Depends(get_db)):
-    reminders = db.query(Reminder).order_by(Reminder.time).all()
-    return [ReminderResponse(id=r.id, label=r.label, time=r.time, repeat_rule=r.repeat_rule, enabled=r.enabled) for r in reminders]
+async def list_reminders(
+    response: Response,
+    limit: int | None = PageLimit,
+    cursor: str | None = PageCursor,
+    fields: str | None = FieldsParam,
+    db: AsyncSession = Depends(get_db),
+):
+    selected = parse_fields(fields, ReminderResponse)
+    columns = select_columns(Reminder, ReminderResponse, selected, required=REMINDER_PAGE_KEYS)
+    rows = (await db.execute(paginate(select(*columns), REMINDER_PAGE_KEYS, cursor, limit))).all()
+    rows, next_cursor = next_page(rows, REMINDER_PAGE_KEYS, limit)
+    items = [_record_data(as_record(Reminder, row), ReminderResponse) for row in rows]
+    return list_response(response, ReminderResponse, items, selected, next_cursor)
 
 
 @app.post("/api/reminders", response_model=ReminderResponse)
-def create_reminder(data: ReminderCreate, db: Session = Depends(get_db)):
+async def create_reminder(
+    data: ReminderCreate, household: Household = Depends(get_household), db: AsyncSession = Depends(get_db)
+):
     r = Reminder(label=data.label, time=data.time, repeat_rule=data.repeat_rule, enabled=data.enabled)
     db.add(r)
-    db.commit()
-    db.refresh(r)
+    await db.commit()
+    await db.refresh(r)
+    _schedule_reminder(household, r)
     return ReminderResponse(id=r.id, label=r.label, time=r.time, repeat_rule=r.repeat_rule, enabled=r.enabled)
 
 
 @app.patch("/api/reminders/{reminder_id}", response_model=ReminderResponse)
-def update_reminder(reminder_id: int, data: ReminderUpdate, db: Session = Depends(get_db)):
-    r = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+async def update_reminder(
+    reminder_id: int,
+    data: ReminderUpdate,
+    household: Household = Depends(get_household),
+    db: AsyncSession = Depends(get_db),
+):
+    r = await db.get(Reminder, reminder_id)
     if not r:
         raise HTTPException(status_code=404, detail="Reminder not found")
     if data.label is not None:
@@ -296,40 +1082,89 @@ def update_reminder(reminder_id: int, data: ReminderUpdate, db: Session = Depend
         r.repeat_rule = data.repeat_rule
     if data.enabled is not None:
         r.enabled = data.enabled
-    db.commit()
-    db.refresh(r)
+    await db.commit()
+    await db.refresh(r)
+    _schedule_reminder(household, r)
     return ReminderResponse(id=r.id, label=r.label, time=r.time, repeat_rule=r.repeat_rule, enabled=r.enabled)
 
 
 @app.delete("/api/reminders/{reminder_id}")
-def delete_reminder(reminder_id: int, db: Session = Depends(get_db)):
-    r = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+async def delete_reminder(
+    reminder_id: int, household: Household = Depends(get_household), db: AsyncSession = Depends(get_db)
+):
+    r = await db.get(Reminder, reminder_id)
     if not r:
         raise HTTPException(status_code=404, detail="Reminder not found")
-    db.delete(r)
-    db.commit()
+    await db.delete(r)
+    await db.commit()
+    household.scheduler.remove(reminder_id)
     return {"ok": True}
 
 
+@app.get("/api/reminders/due")
+async def reminders_due(
+    window: int = Query(60, ge=1, le=3600, description="Seconds to look back for fired reminders"),
+    upcoming: int = Query(0, ge=0, le=100, description="Also return the next N scheduled fires"),
+    household: Household = Depends(get_household),
+):
+    """Reminders the server fired within the last `window` seconds, plus optionally what comes next.
+
+    Async on purpose: the scheduler is only safe to read on the event loop that updates it.
+    """
+    fired = household.scheduler.recent(window)
+    return {"fired": fired, "upcoming": household.scheduler.upcoming(upcoming) if upcoming else []}
+
+
+@app.get("/api/reminders/stream")
+async def reminders_stream(
+    tz: str | None = Query(None, max_length=64, description="The client's IANA time zone, e.g. Europe/London"),
+    household: Household = Depends(get_household),
+):
+    """SSE stream of `reminder` events as reminders fire; replaces polling /api/reminders.
+
+    Fires from the last minute are replayed on connect so a reconnecting client does not miss one;
+    clients dedupe on `fire_id`. Reminder times are read in the client's `tz` unless REMINDER_TZ is set.
+    """
+    await household.adopt_timezone(tz)
+    scheduler = household.scheduler
+    queue = scheduler.subscribe()
+
+    async def events():
+        try:
+            for fire in scheduler.recent(60):
+                yield _sse("reminder", fire)
+            while True:
+                try:
+                    fire = await asyncio.wait_for(queue.get(), timeout=REMINDER_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse("reminder", fire)
+        finally:
+            scheduler.unsubscribe(queue)
+
+    return _sse_response(events())
+
+
 # ---------- Emergency contacts ----------
 @app.get("/api/emergency-contacts", response_model=list[EmergencyContactResponse])
-def list_emergency_contacts(db: Session = Depends(get_db)):
-    contacts = db.query(EmergencyContact).order_by(EmergencyContact.order_priority).all()
-    return [
-        EmergencyContactResponse(
-            id=c.id,
-            name=c.name,
-            phone=c.phone,
-            email=c.email,
-            order_priority=c.order_priority,
-            share_method=c.share_method,
-        )
-        for c in contacts
-    ]
+async def list_emergency_contacts(
+    response: Response,
+    limit: int | None = PageLimit,
+    cursor: str | None = PageCursor,
+    fields: str | None = FieldsParam,
+    db: AsyncSession = Depends(get_db),
+):
+    selected = parse_fields(fields, EmergencyContactResponse)
+    columns = select_columns(EmergencyContact, EmergencyContactResponse, selected, required=CONTACT_PAGE_KEYS)
+    rows = (await db.execute(paginate(select(*columns), CONTACT_PAGE_KEYS, cursor, limit))).all()
+    rows, next_cursor = next_page(rows, CONTACT_PAGE_KEYS, limit)
+    items = [_record_data(as_record(EmergencyContact, row), EmergencyContactResponse) for row in rows]
+    return list_response(response, EmergencyContactResponse, items, selected, next_cursor)
 
 
 @app.post("/api/emergency-contacts", response_model=EmergencyContactResponse)
-def create_emergency_contact(data: EmergencyContactCreate, db: Session = Depends(get_db)):
+async def create_emergency_contact(data: EmergencyContactCreate, db: AsyncSession = Depends(get_db)):
     c = EmergencyContact(
         name=data.name,
         phone=data.phone,
@@ -338,8 +1173,8 @@ def create_emergency_contact(data: EmergencyContactCreate, db: Session = Depends
         share_method=data.share_method,
     )
     db.add(c)
-    db.commit()
-    db.refresh(c)
+    await db.commit()
+    await db.refresh(c)
     return EmergencyContactResponse(
         id=c.id,
         name=c.name,
@@ -351,8 +1186,8 @@ def create_emergency_contact(data: EmergencyContactCreate, db: Session = Depends
 
 
 @app.patch("/api/emergency-contacts/{contact_id}", response_model=EmergencyContactResponse)
-def update_emergency_contact(contact_id: int, data: EmergencyContactUpdate, db: Session = Depends(get_db)):
-    c = db.query(EmergencyContact).filter(EmergencyContact.id == contact_id).first()
+async def update_emergency_contact(contact_id: int, data: EmergencyContactUpdate, db: AsyncSession = Depends(get_db)):
+    c = await db.get(EmergencyContact, contact_id)
     if not c:
         raise HTTPException(status_code=404, detail="Contact not found")
     if data.name is not None:
@@ -365,8 +1200,8 @@ def update_emergency_contact(contact_id: int, data: EmergencyContactUpdate, db:
         c.order_priority = data.order_priority
     if data.share_method is not None:
         c.share_method = data.share_method
-    db.commit()
-    db.refresh(c)
+    await db.commit()
+    await db.refresh(c)
     return EmergencyContactResponse(
         id=c.id,
         name=c.name,
@@ -378,23 +1213,249 @@ def update_emergency_contact(contact_id: int, data: EmergencyContactUpdate, db:
 
 
 @app.delete("/api/emergency-contacts/{contact_id}")
-def delete_emergency_contact(contact_id: int, db: Session = Depends(get_db)):
-    c = db.query(EmergencyContact).filter(EmergencyContact.id == contact_id).first()
+async def delete_emergency_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+    c = await db.get(EmergencyContact, contact_id)
     if not c:
         raise HTTPException(status_code=404, detail="Contact not found")
-    db.delete(c)
-    db.commit()
+    await db.delete(c)
+    await db.commit()
     return {"ok": True}
 
 
+# ---------- Bulk import / export (NDJSON) ----------
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "500"))
+EXPORT_PAGE_SIZE = 500
+
+
+async def _bulk_import(
+    request: Request, household: Household, schema, insert_batch, after_commit=None
+) -> BulkImportResult:
+    """Validate each NDJSON line with `schema` and insert valid rows BULK_BATCH_SIZE at a time.
+
+    `insert_batch(db, [(line, row)])` returns ([(line, new_id)], [BulkRowError]); each batch commits on
+    its own, and a batch the database rejects is reported row by row without stopping the import.
+    """
+    result = BulkImportResult()
+    batch = []
+
+    async def flush():
+        async with household.session() as db:
+            try:
+                created, errors = await insert_batch(db, batch)
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                message = f"{type(e).__name__}: {e.orig if getattr(e, 'orig', None) else e}"
+                created, errors = [], [BulkRowError(line=line, error=message) for line, _ in batch]
+        if after_commit is not None and created:
+            rows = dict(batch)
+            after_commit(household, [(new_id, rows[line]) for line, new_id in created])
+        result.ids.extend(new_id for _, new_id in created)
+        result.errors.extend(errors)
+        batch.clear()
+
+    async for line, row in ndjson_rows(request.stream(), schema):
+        if isinstance(row, str):
+            result.errors.append(BulkRowError(line=line, error=row))
+            continue
+        batch.append((line, row))
+        if len(batch) >= BULK_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+    result.errors.sort(key=lambda e: e.line)
+    result.created, result.failed = len(result.ids), len(result.errors)
+    return result
+
+
+async def _insert_people(db: AsyncSession, batch):
+    errors, lines, values = [], [], []
+    for line, data in batch:
+        try:
+            face_descriptor_f32 = pack_descriptor(data.face_descriptor)
+            photo_hash = await _store_photo(db, data.photo_base64) if data.photo_base64 else None
+        except ValueError as e:
+            errors.append(BulkRowError(line=line, error=str(e)))
+            continue
+        except HTTPException as e:
+            errors.append(BulkRowError(line=line, error=str(e.detail)))
+            continue
+        lines.append(line)
+        values.append(
+            dict(
+                name=data.name,
+                relationship=data.relationship,
+                about=data.about,
+                photo_hash=photo_hash,
+                face_descriptor_f32=face_descriptor_f32,
+                with_you_today=data.with_you_today,
+            )
+        )
+    if not values:
+        return [], errors
+    version = await _bump_gallery_version(db)
+    for v in values:
+        v["gallery_version"] = version
+    ids = (await db.scalars(insert(Person).returning(Person.id, sort_by_parameter_order=True), values)).all()
+    await db.execute(delete(PersonTombstone).where(PersonTombstone.person_id.in_(ids)))
+    return list(zip(lines, ids)), errors
+
+
+def _gallery_add_imported(household: Household, created):
+    for person_id, data in created:
+        household.gallery.upsert(person_id, data.name, data.relationship, data.face_descriptor)
+
+
+async def _insert_conversations(db: AsyncSession, batch):
+    known = set(await db.scalars(select(Person.id).where(Person.id.in_({c.person_id for _, c in batch}))))
+    errors = [BulkRowError(line=line, error="Person not found") for line, c in batch if c.person_id not in known]
+    valid = [(line, c) for line, c in batch if c.person_id in known]
+    if not valid:
+        return [], errors
+    ids = (
+        await db.scalars(
+            insert(Conversation).returning(Conversation.id, sort_by_parameter_order=True),
+            [dict(person_id=c.person_id, date=c.date, summary=c.summary) for _, c in valid],
+        )
+    ).all()
+    newest = (
+        select(Conversation.id)
+        .where(Conversation.person_id == Person.id)
+        .order_by(Conversation.date.desc(), Conversation.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Person)
+        .where(Person.id.in_({c.person_id for _, c in valid}))
+        .values(last_conversation_id=newest)
+        .execution_options(synchronize_session=False)
+    )
+    return [(line, new_id) for (line, _), new_id in zip(valid, ids)], errors
+
+
+async def _insert_reminders(db: AsyncSession, batch):
+    ids = (
+        await db.scalars(
+            insert(Reminder).returning(Reminder.id, sort_by_parameter_order=True),
+            [dict(label=r.label, time=r.time, repeat_rule=r.repeat_rule, enabled=r.enabled) for _, r in batch],
+        )
+    ).all()
+    return [(line, new_id) for (line, _), new_id in zip(batch, ids)], []
+
+
+def _schedule_imported_reminders(household: Household, created):
+    for reminder_id, data in created:
+        household.scheduler.upsert(reminder_id, data.label, data.time, data.repeat_rule, data.enabled)
+
+
+@app.post("/api/bulk/people", response_model=BulkImportResult)
+async def bulk_import_people(request: Request, household: Household = Depends(get_household)):
+    """NDJSON body, one PersonCreate object per line; invalid lines are reported, not fatal."""
+    return await _bulk_import(request, household, PersonCreate, _insert_people, after_commit=_gallery_add_imported)
+
+
+@app.post("/api/bulk/conversations", response_model=BulkImportResult)
+async def bulk_import_conversations(request: Request, household: Household = Depends(get_household)):
+    """NDJSON body, one ConversationCreate object per line (person_id must exist)."""
+    return await _bulk_import(request, household, ConversationCreate, _insert_conversations)
+
+
+@app.post("/api/bulk/reminders", response_model=BulkImportResult)
+async def bulk_import_reminders(request: Request, household: Household = Depends(get_household)):
+    """NDJSON body, one ReminderCreate object per line."""
+    return await _bulk_import(
+        request, household, ReminderCreate, _insert_reminders, after_commit=_schedule_imported_reminders
+    )
+
+
+async def _export_pages(db: AsyncSession, model, schema, keys, aliases=None):
+    """Rows of `model` as records, EXPORT_PAGE_SIZE at a time in keyset order."""
+    columns = select_columns(model, schema, None, aliases, required=keys)
+    cursor = None
+    while True:
+        rows = (await db.execute(paginate(select(*columns), keys, cursor, EXPORT_PAGE_SIZE))).all()
+        rows, cursor = next_page(rows, keys, EXPORT_PAGE_SIZE)
+        yield [as_record(model, row) for row in rows]
+        if cursor is None:
+            return
+
+
+async def _export_lines(household: Household, include_photos: bool):
+    # One session, so the whole export reads from a single snapshot.
+    async with household.session() as db:
+        async for people in _export_pages(db, Person, PersonResponse, PERSON_PAGE_KEYS, PERSON_FIELD_COLUMNS):
+            photos = {}
+            hashes = {p.photo_hash for p in people if p.photo_hash}
+            if include_photos and hashes:
+                photos = dict((await db.execute(select(Photo.hash, Photo.data).where(Photo.hash.in_(hashes)))).all())
+            yield "".join(
+                ndjson_line("person", _person_data(p, photo_base64=encode_base64_photo(photos.get(p.photo_hash))))
+                for p in people
+            )
+        async for convs in _export_pages(db, Conversation, ConversationResponse, CONVERSATION_EXPORT_KEYS):
+            yield "".join(ndjson_line("conversation", _record_data(c, ConversationResponse)) for c in convs)
+        async for reminders in _export_pages(db, Reminder, ReminderResponse, REMINDER_PAGE_KEYS):
+            yield "".join(ndjson_line("reminder", _record_data(r, ReminderResponse)) for r in reminders)
+        async for contacts in _export_pages(db, EmergencyContact, EmergencyContactResponse, CONTACT_PAGE_KEYS):
+            yield "".join(ndjson_line("emergency_contact", _record_data(c, EmergencyContactResponse)) for c in contacts)
+
+
+@app.get("/api/export")
+async def export_all(include_photos: bool = False, household: Household = Depends(get_household)):
+    """Everything as NDJSON, one {"type": ..., ...fields} object per line, streamed a page at a time.
+
+    Lines of one type (minus "type") are valid input for the matching /api/bulk endpoint; ids are
+    reassigned on import, so conversations need their person_id remapped.
+    """
+    return StreamingResponse(
+        _export_lines(household, include_photos),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="remember-me-export.ndjson"'},
+    )
+
+
+async def _export_households(include_photos: bool):
+    for household_id in (None, *shards.household_ids()):
+        yield ndjson_line("household", {"id": household_id})
+        async for chunk in _export_lines(await _household(household_id), include_photos):
+            yield chunk
+
+
+@app.get("/api/admin/export")
+async def export_all_households(include_photos: bool = False):
+    """Like /api/export, across the main database and every household shard.
+
+    Each household's lines follow a {"type": "household", "id": ...} line (id null for the main database).
+    """
+    return StreamingResponse(
+        _export_households(include_photos),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="remember-me-all-households.ndjson"'},
+    )
+
+
 # ---------- Calm Mode (conversational reassurance + optional TTS) ----------
 
+# Seconds Calm Mode waits for Groq's answer (streams: its first line) before using the fixed lines. 0 = no limit.
+CALM_DEADLINE_SECONDS = float(os.environ.get("CALM_DEADLINE_SECONDS", "2"))
 
-def _generate_calm_conversation(location: str | None, nearby_person: str | None) -> tuple[str, list[str]]:
-    """Generate a short conversational reassurance: (full_message, list of lines)."""
-    fallback_msg, fallback_lines = _calm_fallback_conversation(location, nearby_person)
-    if not GROQ_API_KEY:
-        return fallback_msg, fallback_lines
+
+def _reassures(text: str) -> bool:
+    """Calm Mode openings must tell the user they are safe."""
+    return "safe" in text.lower()
+
+
+def _fallback_reason(error: Exception) -> str:
+    """calm_fallbacks_total reason for a failed Groq call."""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, asyncio.TimeoutError):
+        return "deadline"
+    return "error"
+
+
+def _calm_conversation_prompt(location: str | None, nearby_person: str | None) -> list[dict]:
     parts = []
     if location:
         parts.append(f"Current place: {location}")
@@ -409,34 +1470,37 @@ def _generate_calm_conversation(location: str | None, nearby_person: str | None)
         "Output exactly one sentence per line. No numbering, no quotes, no labels."
     )
     user = f"Context: {context}. Write the short opening, one sentence per line, ending with an invitation to talk."
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+async def _generate_calm_conversation(location: str | None, nearby_person: str | None) -> tuple[str, list[str]]:
+    """Generate a short conversational reassurance: (full_message, list of lines)."""
+    fallback_msg, fallback_lines = _calm_fallback_conversation(location, nearby_person)
+    if not GROQ_API_KEY:
+        CALM_FALLBACKS.inc(generator="conversation", reason="no_api_key")
+        return fallback_msg, fallback_lines
     try:
-        with httpx.Client(timeout=15.0) as client:
-            r = client.post(
-                GROQ_URL,
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": SUMMARY_MODEL,
-                    "messages": [
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user},
-                    ],
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            choices = data.get("choices") or []
-            if choices:
-                content = (choices[0].get("message") or {}).get("content") or ""
-                raw = (content or "").strip()
-                if raw and "safe" in raw.lower():
-                    lines = [ln.strip() for ln in raw.splitlines() if ln.strip()][:8]
-                    if lines:
-                        return " ".join(lines), lines
-    except Exception:
-        pass
+        raw = await within(
+            _groq_chat(
+                _calm_conversation_prompt(location, nearby_person),
+                timeout=15.0,
+                call="calm_conversation",
+                hedge=HEDGE_REQUESTS,
+                accept=_reassures,
+            ),
+            CALM_DEADLINE_SECONDS or None,
+        )
+        if raw and _reassures(raw):
+            lines = [ln.strip() for ln in raw.splitlines() if ln.strip()][:8]
+            if lines:
+                return " ".join(lines), lines
+        reason = "rejected"
+    except Exception as e:
+        reason = _fallback_reason(e)
+    CALM_FALLBACKS.inc(generator="conversation", reason=reason)
     return fallback_msg, fallback_lines
 
 
@@ -451,19 +1515,19 @@ def _calm_fallback_conversation(location: str | None, nearby_person: str | None)
     return " ".join(lines), lines
 
 
-def _generate_calm_reply(
+CALM_REPLY_FALLBACK = "You're safe. I'm here with you. Everything is okay."
+
+
+def _calm_reply_prompt(
     user_message: str,
     location: str | None,
     nearby_person: str | None,
     history: list | None,
-) -> tuple[str, list[str]]:
-    """Generate a reassuring reply to what the user just said (real back-and-forth)."""
-    fallback = ("You're safe. I'm here with you. Everything is okay.", ["You're safe. I'm here with you. Everything is okay."])
-    if not GROQ_API_KEY:
-        return fallback
+) -> list[dict] | None:
+    """Chat messages for a reply, or None if the user said nothing usable."""
     user_text = (user_message or "").strip()[:500]
     if not user_text:
-        return fallback
+        return None
     context_parts = []
     if location:
         context_parts.append(f"They are at: {location}.")
@@ -487,88 +1551,349 @@ def _generate_calm_reply(
             if content:
                 messages.append({"role": role, "content": content})
     messages.append({"role": "user", "content": f"{context} What they just said: {user_text}".strip()})
+    return messages
 
+
+async def _generate_calm_reply(
+    user_message: str,
+    location: str | None,
+    nearby_person: str | None,
+    history: list | None,
+) -> tuple[str, list[str]]:
+    """Generate a reassuring reply to what the user just said (real back-and-forth)."""
+    fallback = (CALM_REPLY_FALLBACK, [CALM_REPLY_FALLBACK])
+    if not GROQ_API_KEY:
+        CALM_FALLBACKS.inc(generator="reply", reason="no_api_key")
+        return fallback
+    messages = _calm_reply_prompt(user_message, location, nearby_person, history)
+    if not messages:
+        CALM_FALLBACKS.inc(generator="reply", reason="empty_input")
+        return fallback
     try:
-        with httpx.Client(timeout=15.0) as client:
-            r = client.post(
-                GROQ_URL,
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={"model": SUMMARY_MODEL, "messages": messages},
-            )
-            r.raise_for_status()
-            data = r.json()
-            choices = data.get("choices") or []
-            if choices:
-                content = (choices[0].get("message") or {}).get("content") or ""
-                raw = (content or "").strip()
-                if raw:
-                    lines = [ln.strip() for ln in raw.splitlines() if ln.strip()][:6]
-                    if lines:
-                        return " ".join(lines), lines
-    except Exception:
-        pass
+        # No cache: variety matters in conversation.
+        raw = await within(
+            _groq_chat(messages, timeout=15.0, cache=False, call="calm_reply", hedge=HEDGE_REQUESTS),
+            CALM_DEADLINE_SECONDS or None,
+        )
+        if raw:
+            lines = [ln.strip() for ln in raw.splitlines() if ln.strip()][:6]
+            if lines:
+                return " ".join(lines), lines
+        reason = "rejected"
+    except Exception as e:
+        reason = _fallback_reason(e)
+    CALM_FALLBACKS.inc(generator="reply", reason=reason)
     return fallback
 
 
+async def _stream_calm_lines(
+    messages: list[dict] | None,
+    fallback_lines: list[str],
+    max_lines: int,
+    require_safe: bool = False,
+    cache: bool = True,
+):
+    """Server-sent events: one `line` event per completed line as Groq streams it, then `done`.
+
+    If the model fails, misses CALM_DEADLINE_SECONDS for its first line or (with require_safe)
+    does not start by reassuring, the fallback lines are sent instead. With cache=True a cached completion
+    of the same prompt is replayed, and a completed stream is cached for the next caller.
+    """
+    lines: list[str] = []
+    reason = "no_api_key" if not GROQ_API_KEY else "empty_input"
+    key = ResponseCache.key(SUMMARY_MODEL, messages) if cache and messages else None
+    cached = llm_cache.get(key) if key else None
+    if cached is not None and require_safe and not _reassures(cached.strip().split("\n", 1)[0]):
+        cached = None  # cached without this check; ask again rather than replay it
+    if cached is not None:
+        lines = [ln.strip() for ln in cached.splitlines() if ln.strip()][:max_lines]
+        for i, line in enumerate(lines):
+            yield _sse("line", {"index": i, "text": line})
+    elif GROQ_API_KEY and messages:
+        reason = "rejected"
+        try:
+            completion = _split_lines(_groq_chat_stream(messages, timeout=15.0, call="calm_stream"))
+            async for line in first_within(completion, CALM_DEADLINE_SECONDS or None):
+                if not lines and require_safe and not _reassures(line):
+                    break
+                yield _sse("line", {"index": len(lines), "text": line})
+                lines.append(line)
+                if len(lines) >= max_lines:
+                    break
+            else:
+                if key and lines:
+                    llm_cache.put(key, "\n".join(lines))
+        except Exception as e:
+            reason = _fallback_reason(e)
+    if not lines:
+        CALM_FALLBACKS.inc(generator="stream", reason=reason)
+        lines = fallback_lines
+        for i, line in enumerate(lines):
+            yield _sse("line", {"index": i, "text": line})
+    yield _sse("done", {"message": " ".join(lines), "messages": lines})
+
+
+async def _split_lines(chunks):
+    """Re-chunk streamed text into complete, non-empty, stripped lines."""
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            if line.strip():
+                yield line.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 ELEVENLABS_API_KEY = os.environ.get("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.environ.get("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL")  # calm default
-ELEVENLABS_URL_TEMPLATE = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+ELEVENLABS_BASE_URL = os.environ.get("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1").rstrip("/")
+ELEVENLABS_URL_TEMPLATE = ELEVENLABS_BASE_URL + "/text-to-speech/{voice_id}"
+ELEVENLABS_STREAM_URL_TEMPLATE = ELEVENLABS_URL_TEMPLATE + "/stream"
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+TTS_MAX_CHARS = 1000
+
+tts_cache = AudioCache(
+    os.environ.get("TTS_CACHE_DIR") or data_path(".tts_cache"),
+    max_bytes=int(os.environ.get("TTS_CACHE_MAX_MB", "64")) * 1024 * 1024,
+)
 
 
-def _text_to_speech_elevenlabs(text: str) -> bytes | None:
+async def _text_to_speech_elevenlabs(text: str) -> bytes | None:
     """Return MP3 bytes or None if ElevenLabs is unavailable or fails."""
     if not ELEVENLABS_API_KEY or not (text or "").strip():
         return None
     url = ELEVENLABS_URL_TEMPLATE.format(voice_id=ELEVENLABS_VOICE_ID)
     try:
-        with httpx.Client(timeout=15.0) as client:
-            r = client.post(
-                url,
+        r = await upstream.post(
+            "elevenlabs",
+            url,
+            timeout=15.0,
+            call="tts",
+            headers={
+                "xi-api-key": ELEVENLABS_API_KEY,
+                "Content-Type": "application/json",
+            },
+            json={
+                "text": (text or "").strip()[:TTS_MAX_CHARS],
+                "model_id": ELEVENLABS_MODEL_ID,
+            },
+        )
+        if r.status_code == 200 and r.content:
+            return r.content
+    except Exception:
+        pass
+    return None
+
+
+async def _open_tts_stream(text: str):
+    """Start an ElevenLabs streaming synthesis; returns (exit stack, response) or None on failure.
+
+    The caller owns the stack and must close it once the body has been relayed.
+    """
+    if not ELEVENLABS_API_KEY:
+        return None
+    stack = AsyncExitStack()
+    try:
+        r = await stack.enter_async_context(
+            upstream.stream(
+                "elevenlabs",
+                "POST",
+                ELEVENLABS_STREAM_URL_TEMPLATE.format(voice_id=ELEVENLABS_VOICE_ID),
+                timeout=15.0,
+                call="tts_stream",
                 headers={
                     "xi-api-key": ELEVENLABS_API_KEY,
                     "Content-Type": "application/json",
                 },
-                json={
-                    "text": (text or "").strip()[:1000],
-                    "model_id": "eleven_monolingual_v1",
-                },
+                json={"text": text, "model_id": ELEVENLABS_MODEL_ID},
             )
-            if r.status_code == 200 and r.content:
-                return r.content
+        )
+        if r.status_code == 200:
+            return stack, r
     except Exception:
         pass
+    await stack.aclose()
     return None
 
 
+async def _speak(text: str) -> tuple[str, bytes | None]:
+    """(cache key, MP3 bytes) for a line, synthesizing only on a cache miss."""
+    text = text.strip()[:TTS_MAX_CHARS]
+    key = AudioCache.key(ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, text)
+    audio = tts_cache.get(key)
+    if audio is None:
+        audio = await _text_to_speech_elevenlabs(text)
+        if audio is not None:
+            tts_cache.put(key, audio)
+    return key, audio
+
+
+async def _prewarm_tts():
+    """Synthesize the fixed fallback lines at startup so Calm Mode can always speak them instantly."""
+    if not ELEVENLABS_API_KEY:
+        return
+    lines = _calm_fallback_conversation(None, None)[1] + [CALM_REPLY_FALLBACK]
+    for line in lines:
+        await _speak(line)
+
+
+def _audio_response(request: Request, key: str, audio: bytes) -> Response:
+    """MP3 response with ETag/304 and single-range (bytes=a-b) support."""
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=86400"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    range_header = request.headers.get("range")
+    if range_header and range_header.startswith("bytes=") and "," not in range_header:
+        size = len(audio)
+        start_s, _, end_s = range_header[6:].strip().partition("-")
+        try:
+            if start_s:
+                start, end = int(start_s), int(end_s) if end_s else size - 1
+            else:
+                start, end = max(0, size - int(end_s)), size - 1
+        except ValueError:
+            start, end = size, size
+        end = min(end, size - 1)
+        if start > end:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(content=audio[start : end + 1], status_code=206, media_type="audio/mpeg", headers=headers)
+    return Response(content=audio, media_type="audio/mpeg", headers=headers)
+
+
 @app.post("/api/calm/reassurance", response_model=CalmReassuranceResponse)
-def calm_reassurance(data: CalmReassuranceRequest):
+async def calm_reassurance(data: CalmReassuranceRequest):
     """Generate initial reassurance, then frontend listens and calls /reply for back-and-forth."""
     location = (data.location or "").strip() or None
     nearby = (data.nearby_person or "").strip() or None
-    message, messages = _generate_calm_conversation(location, nearby)
+    message, messages = await _generate_calm_conversation(location, nearby)
     return CalmReassuranceResponse(message=message, messages=messages)
 
 
 @app.post("/api/calm/reply", response_model=CalmReassuranceResponse)
-def calm_reply(data: CalmReplyRequest):
+async def calm_reply(data: CalmReplyRequest):
     """Respond to what the user just said (back-and-forth conversation)."""
     location = (data.location or "").strip() or None
     nearby = (data.nearby_person or "").strip() or None
     history = data.history if isinstance(data.history, list) else None
-    message, messages = _generate_calm_reply(data.user_message, location, nearby, history)
+    message, messages = await _generate_calm_reply(data.user_message, location, nearby, history)
     return CalmReassuranceResponse(message=message, messages=messages)
 
 
+@app.post("/api/calm/reassurance/stream")
+async def calm_reassurance_stream(data: CalmReassuranceRequest):
+    """SSE version of /reassurance: `line` events ({index, text}) as generated, then `done` ({message, messages})."""
+    location = (data.location or "").strip() or None
+    nearby = (data.nearby_person or "").strip() or None
+    _, fallback_lines = _calm_fallback_conversation(location, nearby)
+    return _sse_response(
+        _stream_calm_lines(_calm_conversation_prompt(location, nearby), fallback_lines, max_lines=8, require_safe=True)
+    )
+
+
+@app.post("/api/calm/reply/stream")
+async def calm_reply_stream(data: CalmReplyRequest):
+    """SSE version of /reply, same events as /reassurance/stream."""
+    location = (data.location or "").strip() or None
+    nearby = (data.nearby_person or "").strip() or None
+    history = data.history if isinstance(data.history, list) else None
+    messages = _calm_reply_prompt(data.user_message, location, nearby, history)
+    return _sse_response(_stream_calm_lines(messages, [CALM_REPLY_FALLBACK], max_lines=6, cache=False))
+
+
 @app.post("/api/calm/speak")
-def calm_speak(body: CalmSpeakRequest):
+async def calm_speak(body: CalmSpeakRequest, request: Request):
     """Return TTS audio (ElevenLabs) or 503 so client can use Web Speech API."""
     text = (body.text or "").strip()
     if not text:
         raise HTTPException(status_code=400, detail="text required")
-    audio = _text_to_speech_elevenlabs(text)
+    key, audio = await _speak(text)
     if audio is None:
         raise HTTPException(status_code=503, detail="TTS unavailable")
-    return Response(content=audio, media_type="audio/mpeg")
+    return _audio_response(request, key, audio)
+
+
+@app.api_route("/api/calm/speak/stream", methods=["GET", "POST"])
+async def calm_speak_stream(request: Request, text: str | None = Query(None, max_length=TTS_MAX_CHARS)):
+    """Like /api/calm/speak, but relays audio chunks as ElevenLabs produces them (text via body or ?text=)."""
+    if text is None and request.method == "POST":
+        try:
+            text = CalmSpeakRequest.model_validate_json(await request.body()).text
+        except ValidationError as e:  # bad JSON or wrong shape: the same 422 FastAPI gives typed bodies
+            raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()]) from e
+    text = (text or "").strip()[:TTS_MAX_CHARS]
+    if not text:
+        raise HTTPException(status_code=400, detail="text required")
+    key = AudioCache.key(ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL_ID, text)
+    cached = tts_cache.get(key)
+    if cached is not None:
+        return _audio_response(request, key, cached)
+    opened = await _open_tts_stream(text)
+    if opened is None:
+        raise HTTPException(status_code=503, detail="TTS unavailable")
+    stack, upstream_response = opened
+
+    async def relay():
+        chunks = []
+        try:
+            async for chunk in upstream_response.aiter_bytes():
+                chunks.append(chunk)
+                yield chunk
+            tts_cache.put(key, b"".join(chunks))  # only complete audio is cached
+        finally:
+            await stack.aclose()
+
+    return StreamingResponse(relay(), media_type="audio/mpeg", headers={"ETag": f'"{key}"'})
+
+
+@app.post("/api/calm/speak/lines")
+async def calm_speak_lines(body: CalmSpeakLinesRequest):
+    """Synthesize all lines in parallel and stream their audio back-to-back in order.
+
+    Playback of the first line starts as soon as it is ready; lines that fail are skipped.
+    """
+    lines = [ln.strip()[:TTS_MAX_CHARS] for ln in body.messages if ln.strip()]
+    if not lines:
+        raise HTTPException(status_code=400, detail="messages required")
+    tasks = [asyncio.create_task(_speak(line)) for line in lines]
+    first_ok = None
+    for i, task in enumerate(tasks):
+        if (await task)[1] is not None:
+            first_ok = i
+            break
+    if first_ok is None:
+        raise HTTPException(status_code=503, detail="TTS unavailable")
+
+    async def relay():
+        try:
+            for task in tasks[first_ok:]:
+                _, audio = await task
+                if audio:
+                    yield audio
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(relay(), media_type="audio/mpeg", headers={"X-Line-Count": str(len(lines))})
+
+
+@app.get("/api/calm/speak")
+async def calm_speak_get(request: Request, text: str = Query(..., min_length=1, max_length=TTS_MAX_CHARS)):
+    """Same as POST, addressable by URL so <audio src> can revalidate and seek with Range requests."""
+    return await calm_speak(CalmSpeakRequest(text=text), request)
@@ -0,0 +1,249 @@
+"""In-process metrics in the Prometheus text format, plus per-request timing (Server-Timing).
+
+Deliberately small instead of a client library: counters, gauges and histograms keyed by label
+values, rendered by GET /metrics. Request latency comes from MetricsMiddleware, SQL counts and
+durations from SQLAlchemy cursor events, and upstream calls are recorded by upstream.py.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# Add a Server-Timing header (db, upstream and total time) to every response.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + ([extra] if extra else [])
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()  # sync endpoints run in a thread pool
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in items)
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # label values -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series):
+                labels = _format_labels(self.labels, key, 'le="' + bound + '"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-1]:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.add(Counter("http_requests_total", "HTTP responses sent", ("method", "route", "status")))
+HTTP_LATENCY = registry.add(
+    Histogram("http_request_duration_seconds", "Time until the response finished", ("method", "route"))
+)
+HTTP_IN_FLIGHT = registry.add(Gauge("http_requests_in_flight", "Requests being handled right now"))
+DB_QUERIES = registry.add(
+    Histogram("http_request_db_queries", "SQL statements run per request", ("route",), COUNT_BUCKETS)
+)
+DB_TIME = registry.add(
+    Histogram("http_request_db_seconds", "Time spent in SQL statements per request", ("route",), QUERY_BUCKETS)
+)
+DB_QUERY_LATENCY = registry.add(
+    Histogram("db_query_duration_seconds", "Duration of every SQL statement, background work included", (), QUERY_BUCKETS)
+)
+UPSTREAM_LATENCY = registry.add(
+    Histogram(
+        "upstream_request_duration_seconds",
+        "Groq/ElevenLabs call time (streams: until the response headers)",
+        ("provider", "call"),
+    )
+)
+UPSTREAM_REQUESTS = registry.add(
+    Counter("upstream_requests_total", "Groq/ElevenLabs calls by outcome", ("provider", "call", "outcome"))
+)
+UPSTREAM_HEDGES = registry.add(
+    Counter(
+        "upstream_hedges_total",
+        "Second requests sent after the p95 latency, by which answered first",
+        ("provider", "call", "winner"),
+    )
+)
+UPSTREAM_CIRCUIT_OPEN = registry.add(
+    Gauge("upstream_circuit_open", "1 while calls to the provider are skipped by its circuit breaker", ("provider",))
+)
+CALM_FALLBACKS = registry.add(
+    Counter("calm_fallbacks_total", "Calm Mode answers that used the fixed fallback lines", ("generator", "reason"))
+)
+
+
+class RequestStats:
+    """Time spent by the current request, filled in by the DB events and upstream.py."""
+
+    __slots__ = ("db_queries", "db_seconds", "upstream_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.upstream_seconds = 0.0
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def record_upstream(provider: str, call: str, outcome: str, seconds: float):
+    UPSTREAM_LATENCY.observe(seconds, provider=provider, call=call)
+    UPSTREAM_REQUESTS.inc(provider=provider, call=call, outcome=outcome)
+    stats = current_request.get()
+    if stats is not None:
+        stats.upstream_seconds += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_LATENCY.observe(seconds)
+    stats = current_request.get()  # SQLAlchemy's async bridge runs this in the request's context
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+class MetricsMiddleware:
+    """Per-route request metrics; with SERVER_TIMING, a Server-Timing header on every response.
+
+    Routes are labelled by their template (/api/people/{person_id}), so label values stay bounded.
+    Server-Timing is written with the response headers, so for streamed responses it covers the
+    time until the stream started.
+    """
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", self._server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            current_request.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=method, route=route)
+            DB_QUERIES.observe(stats.db_queries, route=route)
+            DB_TIME.observe(stats.db_seconds, route=route)
+
+    @staticmethod
+    def _server_timing(stats: RequestStats, total: float) -> str:
+        return (
+            f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries", '
+            f"upstream;dur={stats.upstream_seconds * 1000:.1f}, "
+            f"app;dur={total * 1000:.1f}"
+        )
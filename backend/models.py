@@ -1,5 +1,5 @@
 """SQLAlchemy models for Remember Me MVP."""
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, ForeignKey, DateTime, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -12,9 +12,26 @@ class Person(Base):
     name = Column(String(255), nullable=False)
     relationship = Column(String(255), nullable=False)
     about = Column(Text, nullable=True)
-    photo_base64 = Column(Text, nullable=True)  # base64 image for display
-    face_descriptor = Column(Text, nullable=True)  # JSON array of 128 floats for recognition
+    photo_base64 = Column(Text, nullable=True)  # legacy inline image; moved to photos by migrate_db
+    photo_hash = Column(String(64), ForeignKey("photos.hash"), nullable=True)  # sha256 of the image bytes
+    face_descriptor = Column(Text, nullable=True)  # legacy JSON array; moved to face_descriptor_f32 by migrate_db
+    face_descriptor_f32 = Column(LargeBinary, nullable=True)  # 128 little-endian float32 (512 bytes) for recognition
     with_you_today = Column(Boolean, default=False)
+    # Newest conversation by (date, id), kept up to date on insert so tap-to-recall is one PK lookup.
+    # Not a foreign key: conversations already reference people, and SQLite can't add FKs to old tables.
+    last_conversation_id = Column(Integer, nullable=True)
+    gallery_version = Column(Integer, nullable=False, server_default="0")  # counters["gallery"] at last change
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Photo(Base):
+    """Content-addressed image: people sharing the same upload share one row."""
+    __tablename__ = "photos"
+
+    hash = Column(String(64), primary_key=True)  # sha256 hex of data
+    mime = Column(String(50), nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    thumb = Column(LargeBinary, nullable=True)  # JPEG, THUMB_SIZE px; None if data could not be decoded
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -25,6 +42,7 @@ class Conversation(Base):
     person_id = Column(Integer, ForeignKey("people.id", ondelete="CASCADE"), nullable=False)
     date = Column(String(20), nullable=False)  # YYYY-MM-DD
     summary = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, server_default="ready")  # pending (summary job queued), ready, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     person = relationship("Person", backref="conversations")
@@ -51,3 +69,64 @@ class EmergencyContact(Base):
     order_priority = Column(Integer, default=0)
     share_method = Column(String(20), default="sms")  # sms, email
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Job(Base):
+    """Background job run by jobs.JobQueue."""
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(Float, nullable=False, default=0)  # unix time; retry backoff pushes this forward
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PersonTombstone(Base):
+    """A deleted person, kept so recognition clients syncing with ?since= learn about the delete."""
+    __tablename__ = "person_tombstones"
+
+    person_id = Column(Integer, primary_key=True)
+    gallery_version = Column(Integer, nullable=False, index=True)
+
+
+class Counter(Base):
+    """Named monotonically increasing counters (e.g. "gallery", the recognition snapshot version)."""
+    __tablename__ = "counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class Setting(Base):
+    """Household-wide values learned at run time (e.g. "reminder_tz", the zone reminders fire in)."""
+    __tablename__ = "settings"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(String(255), nullable=False)
+
+
+# Composite indexes matching the keyset pagination order of each list endpoint.
+Index("ix_people_name_id", Person.name, Person.id)
+Index("ix_conversations_person_date_id", Conversation.person_id, Conversation.date.desc(), Conversation.id.desc())
+Index("ix_reminders_time_id", Reminder.time, Reminder.id)
+Index("ix_emergency_contacts_priority_id", EmergencyContact.order_priority, EmergencyContact.id)
+
+# Hot-path indexes; benchmarks/query_plans.py checks the queries behind them still use an index.
+Index(
+    "ix_people_with_descriptor_name",
+    Person.name,
+    Person.id,
+    sqlite_where=Person.face_descriptor_f32.isnot(None),
+    postgresql_where=Person.face_descriptor_f32.isnot(None),
+)
+Index("ix_people_photo_hash", Person.photo_hash)
+Index("ix_reminders_enabled_time", Reminder.enabled, Reminder.time)
+Index("ix_jobs_status_run_after", Job.status, Job.run_after)
+Index("ix_people_gallery_version", Person.gallery_version)
@@ -0,0 +1,89 @@
+"""Keyset (cursor) pagination and field projection for list endpoints."""
+import base64
+import json
+from types import SimpleNamespace
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:  # bad base64, bad UTF-8 or bad JSON
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        # Sort key values only: anything else would reach the database as a bad bind parameter.
+        or not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def parse_fields(fields: str | None, schema) -> set[str] | None:
+    """`fields=a,b` -> {"a", "b"} (validated against the response schema); None means every field."""
+    if not fields:
+        return None
+    selected = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = selected - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def select_columns(model, schema, fields: set[str] | None, aliases: dict | None = None, required=()) -> list:
+    """Columns to SELECT for the requested response fields, plus `required` (sort keys, ids).
+
+    `aliases` maps fields that are not plain columns to the columns they are built from.
+    """
+    columns = {c.key: c for c in required}
+    for field in fields or schema.model_fields:
+        for column in (aliases or {}).get(field) or [getattr(model, field, None)]:
+            if column is not None:
+                columns[column.key] = column
+    return list(columns.values())
+
+
+def as_record(model, row) -> SimpleNamespace:
+    """Attribute view of a partial row; columns that were not selected read as None."""
+    return SimpleNamespace(**{**dict.fromkeys(model.__mapper__.columns.keys()), **row._mapping})
+
+
+def paginate(stmt, keys: tuple, cursor: str | None, limit: int | None, descending: bool = False):
+    """Order by `keys` (the last one unique) and resume strictly after `cursor`.
+
+    Fetches one extra row so next_page() can tell whether another page exists.
+    """
+    if cursor:
+        row, last = tuple_(*keys), tuple_(*decode_cursor(cursor, len(keys)))
+        stmt = stmt.where(row < last if descending else row > last)
+    stmt = stmt.order_by(*(k.desc() for k in keys) if descending else keys)
+    return stmt.limit(limit + 1) if limit is not None else stmt
+
+
+def next_page(rows: list, keys: tuple, limit: int | None) -> tuple[list, str | None]:
+    """(rows of this page, cursor for the next page or None)."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], k.key) for k in keys)
+
+
+def list_response(response: Response, schema, items: list[dict], fields: set[str] | None, cursor: str | None):
+    """Full response models, or only the requested fields; the next cursor goes in a header."""
+    headers = {NEXT_CURSOR_HEADER: cursor} if cursor else {}
+    if fields is None:
+        response.headers.update(headers)
+        return [schema(**item) for item in items]
+    return JSONResponse([{k: v for k, v in item.items() if k in fields} for item in items], headers=headers)
@@ -0,0 +1,57 @@
+"""Photo helpers: decoding uploads, content hashes and thumbnails."""
+import base64
+import binascii
+import hashlib
+import io
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+THUMB_SIZE = 160  # px, longest side; People list avatars are 56px at up to 3x density
+THUMB_QUALITY = 80
+
+_MAGIC = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+]
+
+
+def decode_base64_photo(photo_base64: str) -> bytes:
+    """Raw bytes from base64 (a data: URL prefix is accepted). Raises ValueError if invalid."""
+    payload = photo_base64.split(",", 1)[1] if photo_base64.startswith("data:") else photo_base64
+    try:
+        data = base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Photo is not valid base64") from e
+    if not data:
+        raise ValueError("Photo is empty")
+    return data
+
+
+def encode_base64_photo(data: bytes | None) -> str | None:
+    return base64.b64encode(data).decode("ascii") if data else None
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sniff_mime(data: bytes) -> str:
+    for magic, mime in _MAGIC:
+        if data.startswith(magic):
+            return mime
+    return "image/jpeg"  # what the frontend uploads
+
+
+def make_thumbnail(data: bytes) -> bytes | None:
+    """Small JPEG for list views, or None if the bytes are not a readable image."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+            out = io.BytesIO()
+            img.convert("RGB").save(out, format="JPEG", quality=THUMB_QUALITY, optimize=True)
+            return out.getvalue()
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
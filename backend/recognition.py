@@ -0,0 +1,166 @@
+"""In-memory face descriptor gallery for server-side recognition."""
+import os
+import threading
+
+import numpy as np
+
+DESCRIPTOR_SIZE = 128
+MATCH_THRESHOLD = 0.65  # same as the browser matcher in faceRecognition.ts
+RECOGNITION_INDEX = os.environ.get("RECOGNITION_INDEX", "exact")  # exact | ivf
+
+
+class DescriptorGallery:
+    """All enrolled descriptors as one contiguous float32 matrix.
+
+    Rows are kept packed: adding a person appends a row (the buffer grows by doubling),
+    removing a person moves the last row into the freed slot. Searches compute the
+    distances of every query against every row in a single vectorized call.
+    """
+
+    def __init__(self, dim: int = DESCRIPTOR_SIZE):
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._ids: list[int] = []
+        self._rows: dict[int, int] = {}
+        self._meta: dict[int, tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, people) -> None:
+        """Rebuild from (id, name, relationship, descriptor) tuples."""
+        with self._lock:
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+            self._sq_norms = np.empty(0, dtype=np.float32)
+            self._ids = []
+            self._rows = {}
+            self._meta = {}
+            for person_id, name, relationship, descriptor in people:
+                self.upsert(person_id, name, relationship, descriptor)
+
+    def upsert(self, person_id: int, name: str, relationship: str, descriptor) -> None:
+        """Add or replace a person's row; a missing descriptor removes them."""
+        vec = _as_vector(descriptor, self.dim)
+        with self._lock:
+            if vec is None:
+                self.remove(person_id)
+                return
+            row = self._rows.get(person_id)
+            if row is None:
+                row = len(self._ids)
+                self._reserve(row + 1)
+                self._ids.append(person_id)
+                self._rows[person_id] = row
+            self._matrix[row] = vec
+            self._sq_norms[row] = float(vec @ vec)
+            self._meta[person_id] = (name, relationship)
+
+    def remove(self, person_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(person_id, None)
+            if row is None:
+                return
+            self._meta.pop(person_id, None)
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._sq_norms[row] = self._sq_norms[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+            self._ids.pop()
+
+    def save(self) -> None:
+        """Nothing to persist: the exact gallery is rebuilt from the database on startup."""
+
+    def search(self, queries, k: int = 1, threshold: float = MATCH_THRESHOLD) -> list[list[dict]]:
+        """Top-k matches (closest first) under `threshold` for each query descriptor."""
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or q.shape[0] == 0:
+                return [[] for _ in range(q.shape[0])]
+            # ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2, all queries at once
+            d2 = self._sq_dists(q, self._matrix[:n], self._sq_norms[:n])
+            rows = np.broadcast_to(np.arange(n), d2.shape)
+            return [self._top_matches(r, d, k, threshold) for r, d in zip(rows, d2)]
+
+    @staticmethod
+    def _sq_dists(q, matrix, sq_norms):
+        d2 = (q * q).sum(axis=1)[:, None] - 2.0 * (q @ matrix.T) + sq_norms[None, :]
+        return np.maximum(d2, 0.0, out=d2)
+
+    def _top_matches(self, rows, d2, k: int, threshold: float) -> list[dict]:
+        """Closest `k` of the candidate `rows` (squared distances `d2`) under `threshold`."""
+        if len(rows) == 0:
+            return []
+        k = max(1, min(k, len(rows)))
+        top = np.argpartition(d2, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(d2[top])]
+        matches = []
+        for i in top:
+            dist = float(np.sqrt(d2[i]))
+            if dist >= threshold:
+                break
+            person_id = self._ids[rows[i]]
+            name, relationship = self._meta[person_id]
+            matches.append({"id": person_id, "name": name, "relationship": relationship, "distance": dist})
+        return matches
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._matrix.shape[0]
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2, 64)
+        matrix = np.empty((new_capacity, self.dim), dtype=np.float32)
+        sq_norms = np.empty(new_capacity, dtype=np.float32)
+        used = len(self._ids)
+        matrix[:used] = self._matrix[:used]
+        sq_norms[:used] = self._sq_norms[:used]
+        self._matrix = matrix
+        self._sq_norms = sq_norms
+
+
+def pack_descriptor(descriptor) -> bytes | None:
+    """128 floats -> 512 bytes of little-endian float32 (None for none). ValueError for any other length
+    or for NaN/infinite values (including ones too large for float32), which the gallery could not hold."""
+    if not descriptor:
+        return None
+    if len(descriptor) != DESCRIPTOR_SIZE:
+        raise ValueError(f"face_descriptor must have {DESCRIPTOR_SIZE} values, got {len(descriptor)}")
+    if not all_finite(descriptor):
+        raise ValueError("face_descriptor values must be finite numbers")
+    return np.asarray(descriptor, dtype="<f4").tobytes()
+
+
+def all_finite(descriptors) -> bool:
+    """False if any value is NaN or infinite once stored as float32."""
+    with np.errstate(over="ignore"):
+        return bool(np.isfinite(np.asarray(descriptors, dtype=np.float32)).all())
+
+
+def unpack_descriptor(blob: bytes | None):
+    """Packed float32 bytes -> read-only float32 array view (no copy)."""
+    if not blob:
+        return None
+    return np.frombuffer(blob, dtype="<f4")
+
+
+def _as_vector(descriptor, dim: int):
+    if descriptor is None:
+        return None
+    vec = np.asarray(descriptor, dtype=np.float32).reshape(-1)
+    if vec.shape[0] != dim or not all_finite(vec):
+        return None  # a NaN row would come back from every search with a NaN distance
+    return vec
+
+
+def make_gallery(index_path: str | None = None) -> DescriptorGallery:
+    """Gallery implementation selected by RECOGNITION_INDEX (IVF index saved at `index_path`)."""
+    if RECOGNITION_INDEX == "ivf":
+        from ann import IVFGallery
+
+        return IVFGallery(path=index_path)
+    return DescriptorGallery()
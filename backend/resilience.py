@@ -0,0 +1,174 @@
+"""Keeping Calm Mode responsive when Groq or ElevenLabs is slow or failing.
+
+- CircuitBreaker: after repeated failures a provider is skipped for a while, so callers go straight
+  to their fallback instead of waiting for another timeout. Used by upstream.py for every call.
+- LatencyTracker: recent successful call times, for the hedging delay.
+- hedged(): if a call has not answered by the provider's p95 latency, send a second copy and take
+  whichever answers first. Only for idempotent, latency-sensitive calls (Calm Mode completions).
+- within(): a time limit on a call (asyncio.wait_for, with the cut-off call marked as such).
+- first_within(): a time limit on the first item of a stream (the first line Calm Mode speaks).
+
+The time budget itself (CALM_DEADLINE_SECONDS) is applied by the Calm Mode generators in main.py.
+Calls cut off by it are cancelled with the DEADLINE message, which upstream.py counts against the
+provider; any other cancellation (a lost hedge, a client that went away) is not the provider's fault.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from metrics import UPSTREAM_HEDGES
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))  # consecutive failures
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+HEDGE_REQUESTS = os.environ.get("HEDGE_REQUESTS", "").lower() in ("1", "true", "yes")
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20  # no hedging until the p95 means something
+HEDGE_MIN_DELAY = 0.05
+LATENCY_WINDOW = 200
+HEDGE_LOST = "hedge lost"  # cancel message for the slower copy, so it is not counted as a failure
+DEADLINE = "deadline"  # cancel message for a call that ran out of its time budget
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit is open: the call was not attempted."""
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} circuit open")
+        self.provider = provider
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures and rejects calls for `reset_after` seconds.
+
+    Once that has passed, one trial call is let through and the wait starts over; the first success
+    closes the circuit. A trial that never reports back (cancelled) just lets the next one through later.
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_after: float = CIRCUIT_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None or self.threshold <= 0:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_after:
+            return False
+        self.opened_at = now  # half-open: this call is the trial
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.threshold > 0 and self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """The last LATENCY_WINDOW successful call durations per key."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[tuple, deque] = {}
+
+    def observe(self, key: tuple, seconds: float):
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, key: tuple, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> float | None:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def hedged(make_call, delay: float | None, provider: str, call: str):
+    """Await make_call(); if it has not finished after `delay` seconds, also start a second call.
+
+    The first successful result wins and the other call is cancelled. If both fail, the first
+    call's error is raised. A first call that fails before `delay` is not hedged. make_call must
+    raise on an error answer (e.g. raise_for_status), or a fast error would beat a slow success.
+    """
+    if delay is None:
+        return await make_call()
+    first = asyncio.ensure_future(make_call())
+    tasks = [first]
+    cancel_message = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+        tasks.append(asyncio.ensure_future(make_call()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    cancel_message = HEDGE_LOST
+                    UPSTREAM_HEDGES.inc(provider=provider, call=call, winner="primary" if task is first else "hedge")
+                    return task.result()
+        UPSTREAM_HEDGES.inc(provider=provider, call=call, winner="none")
+        return first.result()
+    except asyncio.CancelledError as e:
+        cancel_message = e.args[0] if e.args else None  # e.g. DEADLINE: both copies ran out of time
+        raise
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel(cancel_message)
+                task.add_done_callback(_discard_result)
+
+
+async def within(awaitable, seconds: float | None):
+    """asyncio.wait_for(awaitable, seconds), except that a call still running after `seconds` is
+    cancelled with the DEADLINE message before asyncio.TimeoutError is raised."""
+    if seconds is None:
+        return await awaitable
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait([task], timeout=seconds)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel(DEADLINE)
+        await asyncio.wait([task])
+        if task.cancelled():
+            raise asyncio.TimeoutError
+    return task.result()
+
+
+async def first_within(items, seconds: float | None):
+    """Re-yield an async iterator, raising asyncio.TimeoutError if its first item takes over `seconds`.
+
+    For streams that must start in time but may then take as long as they need.
+    """
+    iterator = aiter(items)
+    try:
+        try:
+            first = await within(anext(iterator), seconds)
+        except StopAsyncIteration:
+            return
+        yield first
+        async for item in iterator:
+            yield item
+    finally:
+        await iterator.aclose()
+
+
+def _discard_result(task: asyncio.Task):
+    if not task.cancelled():
+        task.exception()  # retrieved, so a late failure is not logged as unhandled
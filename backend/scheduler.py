@@ -0,0 +1,184 @@
+"""In-process reminder scheduler: a min-heap of next fire times, pushed to subscribers when due."""
+import asyncio
+import heapq
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Reminder times are wall-clock HH:MM in this zone. Unset, main.py uses the zone the app's browser
+# reports (and the server's local time until one has).
+REMINDER_TZ = os.environ.get("REMINDER_TZ")
+MAX_SLEEP = 60.0  # re-check at least this often, so clock jumps and DST changes are picked up
+
+logger = logging.getLogger(__name__)
+
+
+def next_fire(hhmm: str, repeat_rule: str, after: datetime) -> datetime | None:
+    """First wall-clock time strictly after `after` matching the reminder, or None if unparseable.
+
+    daily and once fire on every day, weekdays on Monday to Friday only; the caller drops "once"
+    reminders after they fire.
+    """
+    try:
+        hour, minute = (int(part) for part in hhmm.split(":"))
+        day = after.date()
+        candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=after.tzinfo)
+    except ValueError:
+        return None
+    if candidate <= after:
+        candidate += timedelta(days=1)
+    while repeat_rule == "weekdays" and candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate  # day arithmetic keeps the wall-clock time across DST changes
+
+
+class ReminderScheduler:
+    """Enabled reminders ordered by next fire time in a heap, updated incrementally.
+
+    Edits bump a per-reminder generation; stale heap entries are skipped when they surface
+    instead of being searched for and removed. Fired reminders are pushed to every subscriber
+    queue and kept for a short while for clients asking what is due.
+    """
+
+    def __init__(self, tz: str | None = REMINDER_TZ, on_once_fired=None, recent_seconds: float = 3600):
+        self.tz = ZoneInfo(tz) if tz else None
+        self.on_once_fired = on_once_fired  # async fn(reminder_id), e.g. to disable it in the database
+        self.recent_seconds = recent_seconds
+        self._heap: list[tuple[float, int, int]] = []  # (fire at, reminder id, generation)
+        self._reminders: dict[int, tuple[dict, int]] = {}  # id -> (reminder fields, generation)
+        self._generation = 0
+        self._recent: deque[dict] = deque()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def now(self) -> datetime:
+        """Current time in the reminder zone (naive local time when none is configured)."""
+        return datetime.now(self.tz)
+
+    def set_timezone(self, name: str) -> bool:
+        """Read HH:MM times in zone `name` from now on, rescheduling everything.
+
+        False (and no change) if the zone is unknown or already in use.
+        """
+        try:
+            tz = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            return False
+        if tz == self.tz:
+            return False
+        self.tz = tz
+        self._heap = []
+        for reminder_id in self._reminders:
+            self._schedule(reminder_id, self.now())
+        self._notify()
+        return True
+
+    def load(self, reminders) -> None:
+        """Replace the schedule with `reminders` (objects with id, label, time, repeat_rule, enabled)."""
+        self._heap, self._reminders = [], {}
+        for r in reminders:
+            self.upsert(r.id, r.label, r.time, r.repeat_rule, r.enabled)
+
+    def upsert(self, reminder_id: int, label: str, hhmm: str, repeat_rule: str | None, enabled: bool) -> None:
+        self._reminders.pop(reminder_id, None)
+        if enabled:
+            self._generation += 1
+            fields = {"id": reminder_id, "label": label, "time": hhmm, "repeat_rule": repeat_rule or "daily"}
+            self._reminders[reminder_id] = (fields, self._generation)
+            self._schedule(reminder_id, self.now())
+        self._notify()
+
+    def remove(self, reminder_id: int) -> None:
+        self._reminders.pop(reminder_id, None)
+
+    def upcoming(self, limit: int = 10) -> list[dict]:
+        """Next fire of each scheduled reminder, soonest first."""
+        live = [(at, rid) for at, rid, gen in self._heap if self._reminders.get(rid, (None, -1))[1] == gen]
+        return [
+            {**self._reminders[rid][0], "fire_at": at, "fire_id": f"{rid}-{int(at)}"}
+            for at, rid in heapq.nsmallest(limit, live)
+        ]
+
+    def recent(self, seconds: float) -> list[dict]:
+        """Reminders that fired within the last `seconds`, oldest first."""
+        cutoff = time.time() - seconds
+        return [fire for fire in self._recent if fire["fire_at"] >= cutoff]
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    @property
+    def subscribed(self) -> bool:
+        """Whether any client is listening (e.g. an open reminder stream)."""
+        return bool(self._subscribers)
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def _schedule(self, reminder_id: int, after: datetime) -> None:
+        fields, generation = self._reminders[reminder_id]
+        at = next_fire(fields["time"], fields["repeat_rule"], after)
+        if at is not None:
+            heapq.heappush(self._heap, (at.timestamp(), reminder_id, generation))
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            for fire in self._pop_due(time.time()):
+                await self._fire(fire)
+            delay = MAX_SLEEP if not self._heap else min(MAX_SLEEP, max(0.0, self._heap[0][0] - time.time()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _pop_due(self, now: float) -> list[dict]:
+        fired = []
+        while self._heap and self._heap[0][0] <= now:
+            at, reminder_id, generation = heapq.heappop(self._heap)
+            entry = self._reminders.get(reminder_id)
+            if entry is None or entry[1] != generation:
+                continue  # edited or deleted since this entry was pushed
+            fields = entry[0]
+            fired.append({**fields, "fire_at": at, "fire_id": f"{reminder_id}-{int(at)}"})
+            if fields["repeat_rule"] == "once":
+                del self._reminders[reminder_id]
+            else:
+                self._schedule(reminder_id, datetime.fromtimestamp(at, self.tz))
+        return fired
+
+    async def _fire(self, fire: dict) -> None:
+        self._recent.append(fire)
+        while self._recent and self._recent[0]["fire_at"] < time.time() - self.recent_seconds:
+            self._recent.popleft()
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(fire)
+            except asyncio.QueueFull:
+                pass  # a stuck client misses events rather than holding memory
+        if fire["repeat_rule"] == "once" and self.on_once_fired is not None:
+            try:
+                await self.on_once_fired(fire["id"])
+            except Exception:
+                # Already delivered and off the schedule; only the database still says enabled.
+                logger.exception("Could not disable once reminder %s after it fired", fire["id"])
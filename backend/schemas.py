@@ -26,7 +26,9 @@ class PersonUpdate(BaseModel):
 
 class PersonResponse(PersonBase):
     id: int
-    photo_base64: Optional[str] = None
+    photo_base64: Optional[str] = None  # list_people only fills this with include_photos=true
+    photo_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     face_descriptor: Optional[List[float]] = None
     with_you_today: bool = False
 
@@ -45,6 +47,33 @@ class PersonForRecognition(BaseModel):
         from_attributes = True
 
 
+class RecognitionSnapshot(BaseModel):
+    """Recognition gallery at `version`: everything (full) or the changes since the client's version."""
+    version: int
+    full: bool
+    people: List[PersonForRecognition]  # added or updated since the client's version
+    deleted: List[int] = []  # person ids to drop (deleted, or no longer have a descriptor)
+
+
+class RecognizeRequest(BaseModel):
+    """One descriptor or a batch (one per detected face); matches are returned per descriptor."""
+    descriptor: Optional[List[float]] = None
+    descriptors: Optional[List[List[float]]] = None
+    k: int = Field(1, ge=1, le=20)
+    threshold: float = Field(0.65, gt=0)
+
+
+class RecognitionMatch(BaseModel):
+    id: int
+    name: str
+    relationship: str
+    distance: float
+
+
+class RecognizeResponse(BaseModel):
+    results: List[List[RecognitionMatch]]  # same order as the request descriptors
+
+
 class ConversationBase(BaseModel):
     date: str = Field(..., pattern=r"^\d{4}-\d{2}-\d{2}$")
     summary: str = Field(..., min_length=1)
@@ -57,16 +86,50 @@ class ConversationCreate(ConversationBase):
 class ConversationResponse(ConversationBase):
     id: int
     person_id: int
+    status: str = "ready"  # pending while a summarize job runs, then ready (or failed)
+    job_id: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+class ConversationSearchHit(BaseModel):
+    """A conversation matching a search, with the matched words of its summary marked **like this**."""
+    id: int
+    person_id: int
+    person_name: str
+    relationship: str
+    date: str
+    snippet: str
+    score: float  # BM25 relevance; higher is a better match
+
+
 class SummarizeAndSaveRequest(BaseModel):
     person_id: int
     transcript: str = ""  # raw speech-to-text; can be long, backend will trim
 
 
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str  # pending, running, done, failed
+    attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class BulkRowError(BaseModel):
+    line: int  # 1-based line of the NDJSON body
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    created: int = 0
+    failed: int = 0
+    ids: List[int] = []  # new ids, in the order of the successfully imported lines
+    errors: List[BulkRowError] = []
+
+
 class ReminderBase(BaseModel):
     label: str = Field(..., min_length=1, max_length=255)
     time: str = Field(..., pattern=r"^\d{1,2}:\d{2}$")  # H:MM or HH:MM
@@ -141,3 +204,8 @@ class CalmReplyRequest(BaseModel):
 
 class CalmSpeakRequest(BaseModel):
     text: str = ""
+
+
+class CalmSpeakLinesRequest(BaseModel):
+    """Lines from CalmReassuranceResponse.messages, synthesized together and played back in order."""
+    messages: List[str] = Field(..., min_length=1, max_length=12)
@@ -0,0 +1,94 @@
+"""Full-text search over conversations: an SQLite FTS5 index kept in sync by triggers.
+
+conversation_fts has one row per conversation (rowid = conversations.id) holding its summary and
+the person's name and relationship, so "garden" or "daughter" finds talks across everyone without
+a LIKE scan. It is created (and back-filled once) by database.migrate_db on SQLite only.
+"""
+import re
+
+from sqlalchemy import column, func, literal_column, select, table, text
+
+from models import Conversation, Person
+
+FTS_TABLE = "conversation_fts"
+conversation_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+# BM25 column weights: summary, name, relationship. Stored as the table's default rank function.
+RANK_FUNCTION = "bm25(10.0, 2.0, 1.0)"
+SNIPPET_MARKS = ("**", "**")  # around matched terms; plain text, so clients never render stored HTML
+SNIPPET_TOKENS = 12
+
+_INDEXED_ROW = (
+    "SELECT new.id, new.summary, p.name, p.relationship FROM people p WHERE p.id = new.person_id"
+)
+SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "summary, name, relationship, tokenize = 'porter unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, summary, name, relationship) {_INDEXED_ROW};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF summary, person_id ON conversations BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} (rowid, summary, name, relationship) {_INDEXED_ROW};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS people_fts_update AFTER UPDATE OF name, relationship ON people BEGIN
+        UPDATE {FTS_TABLE} SET name = new.name, relationship = new.relationship
+        WHERE rowid IN (SELECT id FROM conversations WHERE person_id = new.id);
+    END""",
+]
+
+
+def create_search_index(conn):
+    """Create the FTS table and triggers if missing; index existing conversations the first time."""
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    for statement in SCHEMA:
+        conn.execute(text(statement))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', :rank)"), {"rank": RANK_FUNCTION})
+    if not exists:
+        conn.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, summary, name, relationship) "
+                "SELECT c.id, c.summary, p.name, p.relationship FROM conversations c JOIN people p ON p.id = c.person_id"
+            )
+        )
+
+
+def fts_query(q: str) -> str | None:
+    """User text -> FTS5 query: every word must match, the last one as a prefix (search as you type).
+
+    Words are quoted, so punctuation and FTS5 operators typed by the user are never a syntax error.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+
+def search_statement(query: str, person_ids: list[int] | None = None):
+    """Matching conversations, best first (FTS5 sorts by rank itself, so there is no sort step)."""
+    stmt = (
+        select(
+            Conversation.id,
+            Conversation.person_id,
+            Conversation.date,
+            Person.name.label("person_name"),
+            Person.relationship,
+            func.snippet(literal_column(FTS_TABLE), 0, *SNIPPET_MARKS, "…", SNIPPET_TOKENS).label("snippet"),
+            conversation_fts.c.rank,
+        )
+        .select_from(conversation_fts)
+        .join(Conversation, Conversation.id == conversation_fts.c.rowid)
+        .join(Person, Person.id == Conversation.person_id)
+        .where(literal_column(FTS_TABLE).match(query), Conversation.status != "pending")
+        .order_by(conversation_fts.c.rank)
+    )
+    if person_ids:
+        stmt = stmt.where(Conversation.person_id.in_(person_ids))
+    return stmt
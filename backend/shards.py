@@ -0,0 +1,114 @@
+"""Per-household SQLite shards: a bounded LRU of open engines, each database created on first use.
+
+A request carrying X-Household-Id is served from its own database file under SHARD_DIR, so
+households never share a write lock or a file. Requests without the header use the main database.
+"""
+import asyncio
+import os
+import re
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database import DB_PROFILE, data_path, init_db, make_async_engine
+
+SHARD_HEADER = "X-Household-Id"
+SHARD_DIR = os.environ.get("SHARD_DIR") or data_path(".shards")
+SHARD_MAX_OPEN = int(os.environ.get("SHARD_MAX_OPEN", "32"))  # engines kept open at once
+SHARD_POOL_SIZE = int(os.environ.get("SHARD_POOL_SIZE", "2"))  # connections per shard engine
+SHARD_PREFIX, SHARD_SUFFIX = "household-", ".db"
+HOUSEHOLD_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")  # also keeps ids safe to use in file names
+
+
+def check_household_id(household_id: str) -> str:
+    if not HOUSEHOLD_ID.match(household_id):
+        raise HTTPException(status_code=400, detail=f"Invalid {SHARD_HEADER}")
+    return household_id
+
+
+class ShardRouter:
+    """Async sessions per household, keeping at most `max_open` engines open when they are idle.
+
+    Opening a shard beyond that disposes the least recently used engine with no session in use;
+    busy engines are never disposed, so the cap can be exceeded briefly under load. Each shard is
+    created and migrated (init_db) the first time it is opened in this process.
+    """
+
+    def __init__(
+        self,
+        directory: str = SHARD_DIR,
+        max_open: int = SHARD_MAX_OPEN,
+        pool_size: int = SHARD_POOL_SIZE,
+        profile: str = DB_PROFILE,
+    ):
+        self.directory = directory
+        self.max_open = max_open
+        self.pool_size = pool_size
+        self.profile = profile
+        self._open: OrderedDict[str, tuple] = OrderedDict()  # household id -> (engine, sessionmaker), LRU first
+        self._in_use: Counter[str] = Counter()  # household id -> sessions currently open
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._migrated: set[str] = set()
+        self.opened = self.evicted = 0
+
+    def path(self, household_id: str, suffix: str = SHARD_SUFFIX) -> str:
+        """File for a household's database (or a sidecar of it, e.g. path(id, ".ivf.npz"))."""
+        return os.path.join(self.directory, f"{SHARD_PREFIX}{household_id}{suffix}")
+
+    def exists(self, household_id: str) -> bool:
+        """Whether the household already has a database file."""
+        return os.path.exists(self.path(check_household_id(household_id)))
+
+    def household_ids(self) -> list[str]:
+        """Households that already have a database file, in name order."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[len(SHARD_PREFIX) : -len(SHARD_SUFFIX)]
+            for name in os.listdir(self.directory)
+            if name.startswith(SHARD_PREFIX) and name.endswith(SHARD_SUFFIX)
+        )
+
+    @asynccontextmanager
+    async def session(self, household_id: str):
+        check_household_id(household_id)
+        _, sessions = self._open.get(household_id) or await self._add(household_id)
+        # No await between finding the engine and marking it in use, so it cannot be evicted in between.
+        self._open.move_to_end(household_id)
+        self._in_use[household_id] += 1
+        try:
+            await self._evict()
+            async with sessions() as db:
+                yield db
+        finally:
+            self._in_use[household_id] -= 1
+            if not self._in_use[household_id]:
+                del self._in_use[household_id]
+
+    async def _add(self, household_id: str) -> tuple:
+        async with self._locks.setdefault(household_id, asyncio.Lock()):
+            if household_id in self._open:  # opened by another request while this one waited
+                return self._open[household_id]
+            os.makedirs(self.directory, exist_ok=True)
+            engine = make_async_engine(f"sqlite:///{self.path(household_id)}", self.profile, self.pool_size)
+            if household_id not in self._migrated:
+                await init_db(engine)
+                self._migrated.add(household_id)
+            sessions = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            self._open[household_id] = (engine, sessions)
+            self.opened += 1
+            return engine, sessions
+
+    async def _evict(self):
+        idle = [household_id for household_id in self._open if household_id not in self._in_use]
+        for household_id in idle[: max(0, len(self._open) - self.max_open)]:
+            engine, _ = self._open.pop(household_id)
+            self.evicted += 1
+            await engine.dispose()
+
+    async def close(self):
+        while self._open:
+            _, (engine, _) = self._open.popitem()
+            await engine.dispose()
@@ -0,0 +1,85 @@
+"""On-disk LRU cache for synthesized Calm Mode audio."""
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace/Unicode-insensitive form of a line, so trivially different requests share audio."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class AudioCache:
+    """Content-addressed audio files under `directory`, evicting least recently used past `max_bytes`."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self._loaded = False
+
+    @staticmethod
+    def key(voice_id: str, model_id: str, text: str) -> str:
+        raw = "\0".join([voice_id, model_id, normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            try:
+                os.utime(self._path(key))  # keeps LRU order across restarts
+            except OSError:
+                pass
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+            self._total += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._total > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _load(self) -> None:
+        """Index files already on disk (oldest access first) the first time the cache is used."""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                st = entry.stat()
+                files.append((st.st_mtime, entry.name[:-4], st.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+        self._loaded = True
+
+    def _drop(self, key: str) -> None:
+        self._total -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".mp3")
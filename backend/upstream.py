@@ -0,0 +1,144 @@
+"""Shared outbound HTTP client for Groq and ElevenLabs calls."""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from metrics import UPSTREAM_CIRCUIT_OPEN, UPSTREAM_REQUESTS, record_upstream
+from resilience import DEADLINE, HEDGE_MIN_DELAY, HEDGE_QUANTILE, CircuitBreaker, CircuitOpenError, LatencyTracker
+
+# Max in-flight requests per provider; extra calls wait instead of opening more connections.
+PROVIDER_CONCURRENCY = {
+    "groq": int(os.environ.get("GROQ_CONCURRENCY", "8")),
+    "elevenlabs": int(os.environ.get("ELEVENLABS_CONCURRENCY", "4")),
+}
+
+
+class Upstream:
+    """One pooled httpx.AsyncClient (HTTP/2, keep-alive) with a concurrency cap per provider.
+
+    Each provider also has a circuit breaker: while it is open, calls raise CircuitOpenError
+    without touching the network. Opened and closed by the app lifespan; used lazily if a call
+    happens outside it.
+    """
+
+    def __init__(self, concurrency: dict[str, int]):
+        self.concurrency = concurrency
+        self._client: httpx.AsyncClient | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.latencies = LatencyTracker()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._open()
+        return self._client
+
+    def _open(self):
+        pool_size = sum(self.concurrency.values())
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=60.0,
+            ),
+        )
+
+    def limit(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.concurrency.get(provider, 4))
+        return self._semaphores[provider]
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker()
+        return self.breakers[provider]
+
+    def hedge_delay(self, provider: str, call: str) -> float | None:
+        """How long to wait before hedging a call: its recent p95, or None until there is enough history."""
+        p95 = self.latencies.quantile((provider, call), HEDGE_QUANTILE)
+        return None if p95 is None else max(HEDGE_MIN_DELAY, p95)
+
+    def _check_circuit(self, provider: str, call: str):
+        if not self.breaker(provider).allow():
+            UPSTREAM_REQUESTS.inc(provider=provider, call=call, outcome="circuit_open")
+            raise CircuitOpenError(provider)
+
+    def _record(self, provider: str, call: str, outcome: str, seconds: float):
+        """Metrics, the breaker's verdict and (for successes) the latency history."""
+        record_upstream(provider, call, outcome, seconds)
+        breaker = self.breaker(provider)
+        if outcome in ("timeout", "deadline", "error", "http_5xx", "http_429"):
+            breaker.record_failure()
+        elif outcome != "cancelled":
+            breaker.record_success()
+            if outcome == "ok":
+                self.latencies.observe((provider, call), seconds)
+        UPSTREAM_CIRCUIT_OPEN.set(int(breaker.is_open), provider=provider)
+
+    async def start(self):
+        if self._client is None:
+            self._open()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphores = {}
+
+    async def post(self, provider: str, url: str, *, timeout: float, call: str | None = None, **kwargs) -> httpx.Response:
+        """POST with the provider's slot held; latency and outcome are recorded under `call`."""
+        call = call or provider
+        self._check_circuit(provider, call)
+        async with self.limit(provider):
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(url, timeout=timeout, **kwargs)
+            except (Exception, asyncio.CancelledError) as e:
+                self._record(provider, call, _failure(e), time.perf_counter() - start)
+                raise
+            self._record(provider, call, _outcome(response), time.perf_counter() - start)
+            return response
+
+    @asynccontextmanager
+    async def stream(self, provider: str, method: str, url: str, *, timeout: float, call: str | None = None, **kwargs):
+        """Streaming request; the provider slot is held until the body has been consumed or closed.
+
+        Latency is recorded when the response headers arrive (time to first byte).
+        """
+        call = call or provider
+        self._check_circuit(provider, call)
+        async with self.limit(provider):
+            start = time.perf_counter()
+            recorded = False
+            try:
+                async with self.client.stream(method, url, timeout=timeout, **kwargs) as response:
+                    self._record(provider, call, _outcome(response), time.perf_counter() - start)
+                    recorded = True
+                    yield response
+            except (Exception, asyncio.CancelledError) as e:
+                if not recorded:  # errors while reading the body are the caller's to report
+                    self._record(provider, call, _failure(e), time.perf_counter() - start)
+                raise
+
+
+def _outcome(response: httpx.Response) -> str:
+    if response.status_code == 429:
+        return "http_429"
+    return "ok" if response.status_code < 400 else f"http_{response.status_code // 100}xx"
+
+
+def _failure(error: BaseException) -> str:
+    """Outcome of a call that raised. A call cancelled with the DEADLINE message ran out of its caller's
+    time budget (CALM_DEADLINE_SECONDS), which counts against the provider; any other cancellation
+    (a lost hedge race, a client that disconnected) says nothing about the provider."""
+    if isinstance(error, asyncio.CancelledError):
+        return "deadline" if DEADLINE in error.args else "cancelled"
+    return "timeout" if isinstance(error, httpx.TimeoutException) else "error"
+
+
+upstream = Upstream(PROVIDER_CONCURRENCY)
@@ -0,0 +1,51 @@
+"""Compact binary encoding of the recognition gallery.
+
+Layout (little-endian):
+    16-byte header: magic "RMG1", dtype code (u8), reserved (u8), dim (u16), count (u32), meta length (u32)
+    meta: UTF-8 JSON {"version", "full", "deleted", "people": [{"id", "name", "relationship"}]},
+          space-padded so what follows starts on a 4-byte boundary
+    i8 only: `count` float32 row scales (descriptor = int8 values * scale)
+    descriptors: count x dim values of the dtype, row i belonging to meta["people"][i]
+"""
+import json
+import struct
+
+import numpy as np
+
+MEDIA_TYPE = "application/octet-stream"
+MAGIC = b"RMG1"
+HEADER = struct.Struct("<4sBBHII")
+DTYPES = {"f32": (0, "<f4"), "f16": (1, "<f2"), "i8": (2, "i1")}
+DTYPE_CODES = {code: (name, np_dtype) for name, (code, np_dtype) in DTYPES.items()}
+
+
+def encode_gallery(meta: dict, descriptors, dim: int, dtype: str = "f32") -> bytes:
+    """`descriptors`: one float vector of length `dim` per entry of meta["people"]."""
+    code, np_dtype = DTYPES[dtype]
+    matrix = np.asarray(descriptors, dtype=np.float32).reshape(-1, dim)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    meta_bytes += b" " * (-(HEADER.size + len(meta_bytes)) % 4)
+    parts = [HEADER.pack(MAGIC, code, 0, dim, len(matrix), len(meta_bytes)), meta_bytes]
+    if dtype == "i8":
+        scales = np.abs(matrix).max(axis=1, initial=0.0) / 127
+        scales[scales == 0] = 1.0
+        parts.append(scales.astype("<f4").tobytes())
+        parts.append(np.rint(matrix / scales[:, None]).astype(np.int8).tobytes())
+    else:
+        parts.append(matrix.astype(np_dtype).tobytes())
+    return b"".join(parts)
+
+
+def decode_gallery(data: bytes) -> tuple[dict, np.ndarray]:
+    """Inverse of encode_gallery: (meta, float32 matrix of shape (count, dim))."""
+    magic, code, _, dim, count, meta_len = HEADER.unpack_from(data)
+    if magic != MAGIC or code not in DTYPE_CODES:
+        raise ValueError("Not a recognition gallery payload")
+    name, np_dtype = DTYPE_CODES[code]
+    offset = HEADER.size + meta_len
+    meta = json.loads(data[HEADER.size:offset])
+    if name == "i8":
+        scales = np.frombuffer(data, "<f4", count, offset)
+        values = np.frombuffer(data, np.int8, count * dim, offset + 4 * count).reshape(count, dim)
+        return meta, values.astype(np.float32) * scales[:, None]
+    return meta, np.frombuffer(data, np_dtype, count * dim, offset).astype(np.float32).reshape(count, dim)
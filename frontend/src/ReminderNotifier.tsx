@@ -1,94 +1,56 @@
 import { useEffect, useState, useRef } from "react";
-import { getReminders, type Reminder } from "./api";
+import { subscribeReminders, type ReminderFire } from "./api";
 
-const CHECK_INTERVAL_MS = 60 * 1000; // every minute
 const SHOWN_KEY = "reminder_shown";
 
-function todayKey(): string {
-  const d = new Date();
-  return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, "0")}-${String(d.getDate()).padStart(2, "0")}`;
-}
-
-function wasShownToday(reminderId: number): boolean {
+/** The stream replays recent fires on reconnect, so remember the last fire shown per reminder. */
+function wasShown(fire: ReminderFire): boolean {
   try {
     const raw = localStorage.getItem(SHOWN_KEY);
     if (!raw) return false;
     const data = JSON.parse(raw) as Record<string, string>;
-    return data[`${reminderId}`] === todayKey();
+    return data[`${fire.id}`] === fire.fire_id;
   } catch {
     return false;
   }
 }
 
-function markShownToday(reminderId: number): void {
+function markShown(fire: ReminderFire): void {
   try {
     const raw = localStorage.getItem(SHOWN_KEY) || "{}";
     const data = JSON.parse(raw) as Record<string, string>;
-    data[`${reminderId}`] = todayKey();
+    data[`${fire.id}`] = fire.fire_id;
     localStorage.setItem(SHOWN_KEY, JSON.stringify(data));
   } catch (_) {}
 }
 
-function currentTimeHHMM(): string {
-  const d = new Date();
-  return `${String(d.getHours()).padStart(2, "0")}:${String(d.getMinutes()).padStart(2, "0")}`;
-}
-
-/** Normalize "9:00" to "09:00" for comparison. */
-function normalizeHHMM(time: string): string {
-  const [h, m] = time.split(":").map(Number);
-  if (Number.isNaN(h) || Number.isNaN(m)) return "";
-  return `${String(h).padStart(2, "0")}:${String(m).padStart(2, "0")}`;
-}
-
-/** Returns true if reminder at `time` (H:MM or HH:MM) should fire right now (current minute). */
-function isTimeNow(time: string): boolean {
-  const now = currentTimeHHMM();
-  return now === normalizeHHMM(time);
-}
-
 export default function ReminderNotifier() {
-  const [activeReminder, setActiveReminder] = useState<Reminder | null>(null);
+  const [activeReminder, setActiveReminder] = useState<ReminderFire | null>(null);
   const permissionAsked = useRef(false);
 
   useEffect(() => {
-    if (typeof window === "undefined" || !("Notification" in window)) return;
+    if (typeof window === "undefined") return;
 
-    if (!permissionAsked.current && Notification.permission === "default") {
+    if ("Notification" in window && !permissionAsked.current && Notification.permission === "default") {
       permissionAsked.current = true;
       Notification.requestPermission().catch(() => {});
     }
 
-    const check = async () => {
-      try {
-        const list = await getReminders();
-        const enabled = list.filter((r) => r.enabled);
-        const now = currentTimeHHMM();
-
-        for (const r of enabled) {
-          if (!isTimeNow(r.time)) continue;
-          if (wasShownToday(r.id)) continue;
-
-          markShownToday(r.id);
-
-          if (Notification.permission === "granted") {
-            try {
-              new Notification("Reminder: " + r.label, {
-                body: `Scheduled at ${r.time}`,
-                tag: `reminder-${r.id}-${todayKey()}`,
-              });
-            } catch (_) {}
-          }
-
-          setActiveReminder(r);
-          break; // one at a time in-app
-        }
-      } catch (_) {}
-    };
-
-    check();
-    const id = setInterval(check, CHECK_INTERVAL_MS);
-    return () => clearInterval(id);
+    return subscribeReminders((fire) => {
+      if (wasShown(fire)) return;
+      markShown(fire);
+
+      if ("Notification" in window && Notification.permission === "granted") {
+        try {
+          new Notification("Reminder: " + fire.label, {
+            body: `Scheduled at ${fire.time}`,
+            tag: `reminder-${fire.fire_id}`,
+          });
+        } catch (_) {}
+      }
+
+      setActiveReminder(fire);
+    });
   }, []);
 
   if (!activeReminder) return null;
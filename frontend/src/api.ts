@@ -1,3 +1,5 @@
+import { decodeGallery, GALLERY_MEDIA_TYPE } from "./galleryWire";
+
 const API = "/api";
 const FETCH_TIMEOUT_MS = 15000;
 
@@ -20,7 +22,9 @@ export type Person = {
   name: string;
   relationship: string;
   about?: string | null;
-  photo_base64?: string | null;
+  photo_base64?: string | null; // only in list responses with include_photos=true
+  photo_url?: string | null;
+  thumbnail_url?: string | null;
   face_descriptor?: number[] | null;
   with_you_today: boolean;
 };
@@ -56,8 +60,10 @@ export type EmergencyContact = {
   share_method: string;
 };
 
-export async function getPeople(): Promise<Person[]> {
-  const r = await fetchWithTimeout(`${API}/people`);
+/** `fields` limits the response (and the columns the server reads) to those Person keys. */
+export async function getPeople(fields?: (keyof Person)[]): Promise<Person[]> {
+  const query = fields?.length ? `?fields=${fields.join(",")}` : "";
+  const r = await fetchWithTimeout(`${API}/people${query}`);
   if (!r.ok) throw new Error("Failed to fetch people");
   return r.json();
 }
@@ -68,6 +74,69 @@ export async function getPeopleForRecognition(): Promise<PersonForRecognition[]>
   return r.json();
 }
 
+export type RecognitionSnapshot = {
+  version: number;
+  full: boolean;
+  people: PersonForRecognition[];
+  deleted: number[];
+};
+
+type RecognitionGallery = { version: number; people: Record<number, PersonForRecognition> };
+
+const RECOGNITION_GALLERY_KEY = "recognition_gallery";
+let recognitionGallery: RecognitionGallery | null = null;
+
+/**
+ * Recognition people kept in sync by version: the first call downloads everything (or resumes from
+ * localStorage), later calls fetch only people added, changed or deleted since the last version.
+ */
+export async function syncPeopleForRecognition(): Promise<{ version: number; people: PersonForRecognition[] }> {
+  if (!recognitionGallery) {
+    try {
+      recognitionGallery = JSON.parse(localStorage.getItem(RECOGNITION_GALLERY_KEY) || "null");
+    } catch {
+      recognitionGallery = null;
+    }
+  }
+  const since = recognitionGallery ? `&since=${recognitionGallery.version}` : "";
+  // Half-precision descriptors: a fraction of the JSON size, and far below the match threshold in error.
+  const r = await fetchWithTimeout(`${API}/recognition/snapshot?dtype=f16${since}`, {
+    headers: { Accept: GALLERY_MEDIA_TYPE },
+  });
+  if (!r.ok) throw new Error("Failed to fetch people for recognition");
+  const snapshot = decodeGallery(await r.arrayBuffer());
+  const people = snapshot.full || !recognitionGallery ? {} : { ...recognitionGallery.people };
+  for (const id of snapshot.deleted) delete people[id];
+  for (const p of snapshot.people) people[p.id] = p;
+  recognitionGallery = { version: snapshot.version, people };
+  try {
+    localStorage.setItem(RECOGNITION_GALLERY_KEY, JSON.stringify(recognitionGallery));
+  } catch {
+    // storage full or unavailable: keep the in-memory copy only
+  }
+  const list = Object.values(people).sort((a, b) => a.name.localeCompare(b.name));
+  return { version: snapshot.version, people: list };
+}
+
+export type RecognitionMatch = {
+  id: number;
+  name: string;
+  relationship: string;
+  distance: number;
+};
+
+/** Server-side matching: one result list (closest first) per descriptor, in request order. */
+export async function recognizeFaces(descriptors: number[][], k = 1): Promise<RecognitionMatch[][]> {
+  const r = await fetchWithTimeout(`${API}/recognize`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ descriptors, k }),
+  });
+  if (!r.ok) throw new Error("Failed to recognize faces");
+  const data = await r.json();
+  return data.results;
+}
+
 export async function getPerson(id: number): Promise<Person> {
   const r = await fetchWithTimeout(`${API}/people/${id}`);
   if (!r.ok) throw new Error("Failed to fetch person");
@@ -120,6 +189,15 @@ export async function getLastConversation(personId: number): Promise<Conversatio
   return data.id != null ? data : null;
 }
 
+/** Latest conversation of each person (e.g. every recognized face) in one request; people without one are omitted. */
+export async function getLastConversations(personIds: number[]): Promise<Conversation[]> {
+  if (personIds.length === 0) return [];
+  const query = personIds.map((id) => `person_id=${id}`).join("&");
+  const r = await fetchWithTimeout(`${API}/people/last-conversations?${query}`);
+  if (!r.ok) throw new Error("Failed to fetch last conversations");
+  return r.json();
+}
+
 export async function createConversation(data: { person_id: number; date: string; summary: string }): Promise<Conversation> {
   const r = await fetch(`${API}/conversations`, {
     method: "POST",
@@ -130,6 +208,25 @@ export async function createConversation(data: { person_id: number; date: string
   return r.json();
 }
 
+export type Job = {
+  id: string;
+  kind: string;
+  status: "pending" | "running" | "done" | "failed";
+  attempts: number;
+  result?: Record<string, unknown> | null;
+  error?: string | null;
+};
+
+export async function getJob(id: string): Promise<Job> {
+  const r = await fetchWithTimeout(`${API}/jobs/${id}`);
+  if (!r.ok) throw new Error("Failed to fetch job");
+  return r.json();
+}
+
+const JOB_POLL_MS = 1000;
+const JOB_WAIT_MS = 60000;
+
+/** Saves right away; the summary is written by a background job, which this waits for. */
 export async function summarizeAndSaveConversation(personId: number, transcript: string): Promise<Conversation> {
   const r = await fetch(`${API}/conversations/summarize-and-save`, {
     method: "POST",
@@ -140,7 +237,16 @@ export async function summarizeAndSaveConversation(personId: number, transcript:
     const err = await r.json().catch(() => ({}));
     throw new Error((err as { detail?: string }).detail || "Failed to summarize and save");
   }
-  return r.json();
+  const pending: Conversation & { job_id?: string | null } = await r.json();
+  if (!pending.job_id) return pending;
+  const deadline = Date.now() + JOB_WAIT_MS;
+  while (Date.now() < deadline) {
+    await new Promise((res) => setTimeout(res, JOB_POLL_MS));
+    const job = await getJob(pending.job_id);
+    if (job.status === "done" && job.result) return job.result as unknown as Conversation;
+    if (job.status === "failed") throw new Error("Could not summarize the conversation");
+  }
+  return pending;
 }
 
 export async function getReminders(): Promise<Reminder[]> {
@@ -174,6 +280,25 @@ export async function deleteReminder(id: number): Promise<void> {
   if (!r.ok) throw new Error("Failed to delete reminder");
 }
 
+/** A reminder firing, as pushed by the server scheduler. `fire_id` is unique per reminder per fire time. */
+export type ReminderFire = Pick<Reminder, "id" | "label" | "time" | "repeat_rule"> & {
+  fire_at: number;
+  fire_id: string;
+};
+
+/** Subscribe to reminder fires over SSE (the browser reconnects on its own). Returns an unsubscribe function. */
+export function subscribeReminders(onFire: (fire: ReminderFire) => void): () => void {
+  // Reminder times are the user's wall-clock times: tell the server which zone they are in.
+  const tz = Intl.DateTimeFormat().resolvedOptions().timeZone;
+  const source = new EventSource(`${API}/reminders/stream${tz ? `?tz=${encodeURIComponent(tz)}` : ""}`);
+  source.addEventListener("reminder", (e) => {
+    try {
+      onFire(JSON.parse((e as MessageEvent).data));
+    } catch (_) {}
+  });
+  return () => source.close();
+}
+
 export async function getEmergencyContacts(): Promise<EmergencyContact[]> {
   const r = await fetchWithTimeout(`${API}/emergency-contacts`);
   if (!r.ok) throw new Error("Failed to fetch emergency contacts");
@@ -253,6 +378,73 @@ export async function getCalmReply(params: {
   return r.json();
 }
 
+/** Reads a Calm Mode SSE stream, calling onLine as each line is generated; resolves with the full reply. */
+async function readCalmStream(
+  path: string,
+  body: unknown,
+  onLine: (text: string, index: number) => void
+): Promise<CalmReassuranceResponse> {
+  const r = await fetch(`${API}${path}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  });
+  if (!r.ok || !r.body) throw new Error("Calm Mode stream unavailable");
+  const reader = r.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  let result: CalmReassuranceResponse | null = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let end: number;
+    while ((end = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      const event = /^event: (.*)$/m.exec(raw)?.[1];
+      const data = /^data: (.*)$/m.exec(raw)?.[1];
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === "line") onLine(payload.text, payload.index);
+      else if (event === "done") result = payload;
+    }
+  }
+  if (!result) throw new Error("Calm Mode stream ended early");
+  return result;
+}
+
+export function streamCalmReassurance(
+  params: { location?: string | null; nearbyPerson?: string | null },
+  onLine: (text: string, index: number) => void
+): Promise<CalmReassuranceResponse> {
+  return readCalmStream(
+    "/calm/reassurance/stream",
+    { location: params.location || undefined, nearby_person: params.nearbyPerson || undefined },
+    onLine
+  );
+}
+
+export function streamCalmReply(
+  params: {
+    userMessage: string;
+    location?: string | null;
+    nearbyPerson?: string | null;
+    history?: { role: string; content: string }[];
+  },
+  onLine: (text: string, index: number) => void
+): Promise<CalmReassuranceResponse> {
+  return readCalmStream(
+    "/calm/reply/stream",
+    {
+      user_message: params.userMessage,
+      location: params.location || undefined,
+      nearby_person: params.nearbyPerson || undefined,
+      history: params.history,
+    },
+    onLine
+  );
+}
+
 export async function getCalmSpeakAudio(text: string): Promise<Blob | null> {
   const r = await fetch(`${API}/calm/speak`, {
     method: "POST",
@@ -0,0 +1,55 @@
+/**
+ * Decoder for the binary recognition gallery (backend/wire.py), requested with
+ * `Accept: application/octet-stream` and `?dtype=f32|f16|i8`.
+ */
+import type { RecognitionSnapshot } from "./api";
+
+export const GALLERY_MEDIA_TYPE = "application/octet-stream";
+const MAGIC = "RMG1";
+const HEADER_SIZE = 16;
+
+type GalleryMeta = Omit<RecognitionSnapshot, "people"> & {
+  people: { id: number; name: string; relationship: string }[];
+};
+
+function float16ToNumber(bits: number): number {
+  const sign = bits & 0x8000 ? -1 : 1;
+  const exponent = (bits >> 10) & 0x1f;
+  const fraction = bits & 0x3ff;
+  if (exponent === 0) return sign * 2 ** -14 * (fraction / 1024);
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * 2 ** (exponent - 15) * (1 + fraction / 1024);
+}
+
+export function decodeGallery(buffer: ArrayBuffer): RecognitionSnapshot {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== MAGIC) throw new Error("Not a recognition gallery payload");
+  const dtype = view.getUint8(4);
+  const dim = view.getUint16(6, true);
+  const count = view.getUint32(8, true);
+  const metaLength = view.getUint32(12, true);
+  const meta: GalleryMeta = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, HEADER_SIZE, metaLength)));
+  let offset = HEADER_SIZE + metaLength;
+
+  let row: (i: number) => number[];
+  if (dtype === 0) {
+    const values = new Float32Array(buffer, offset, count * dim);
+    row = (i) => Array.from(values.subarray(i * dim, (i + 1) * dim));
+  } else if (dtype === 1) {
+    const values = new Uint16Array(buffer, offset, count * dim);
+    row = (i) => Array.from(values.subarray(i * dim, (i + 1) * dim), float16ToNumber);
+  } else if (dtype === 2) {
+    const scales = new Float32Array(buffer, offset, count);
+    offset += 4 * count;
+    const values = new Int8Array(buffer, offset, count * dim);
+    row = (i) => Array.from(values.subarray(i * dim, (i + 1) * dim), (v) => v * scales[i]);
+  } else {
+    throw new Error(`Unknown descriptor dtype ${dtype}`);
+  }
+
+  return {
+    ...meta,
+    people: meta.people.map((p, i) => ({ ...p, face_descriptor: row(i) })),
+  };
+}
@@ -1,6 +1,6 @@
 import { useEffect, useRef, useState, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
-import { getPeopleForRecognition, summarizeAndSaveConversation } from "../api";
+import { syncPeopleForRecognition, summarizeAndSaveConversation } from "../api";
 import type { PersonForRecognition } from "../api";
 import {
   loadFaceApiModels,
@@ -13,6 +13,7 @@ import { Layout, Card, Button } from "../components";
 const FPS = 3;
 const MAX_TRANSCRIPT_LEN = 6000;
 const LAST_SAVED_KEY = "live_last_saved_conversation";
+const GALLERY_SYNC_INTERVAL_MS = 30000;
 
 type LastSavedConversation = {
   personId: number;
@@ -75,6 +76,7 @@ export default function LiveView() {
   const [apiPeopleError, setApiPeopleError] = useState<string | null>(null);
   const [modelsReady, setModelsReady] = useState(false);
   const [people, setPeople] = useState<PersonForRecognition[]>([]);
+  const galleryVersionRef = useRef<number | null>(null);
   const [matches, setMatches] = useState<FaceMatch[]>([]);
   const [stream, setStream] = useState<MediaStream | null>(null);
   const [transcript, setTranscript] = useState("");
@@ -98,8 +100,9 @@ export default function LiveView() {
       }
       setModelsReady(true);
       try {
-        const list = await getPeopleForRecognition();
+        const { version, people: list } = await syncPeopleForRecognition();
         if (!cancelled) {
+          galleryVersionRef.current = version;
           setPeople(list);
           setApiPeopleError(null);
         }
@@ -115,6 +118,23 @@ export default function LiveView() {
     };
   }, []);
 
+  // Pick up people added, edited or deleted elsewhere (only the changes are downloaded)
+  useEffect(() => {
+    if (!modelsReady) return;
+    const id = setInterval(async () => {
+      try {
+        const { version, people: list } = await syncPeopleForRecognition();
+        if (version !== galleryVersionRef.current) {
+          galleryVersionRef.current = version;
+          setPeople(list);
+        }
+      } catch {
+        // keep the current list; the next tick retries
+      }
+    }, GALLERY_SYNC_INTERVAL_MS);
+    return () => clearInterval(id);
+  }, [modelsReady]);
+
   // Start camera
   useEffect(() => {
     if (!modelsReady || !videoRef.current) return;
@@ -10,7 +10,7 @@ export default function PeopleList() {
 
   const load = async () => {
     try {
-      const list = await getPeople();
+      const list = await getPeople(["id", "name", "relationship", "thumbnail_url"]);
       setPeople(list);
       setError(null);
     } catch (e) {
@@ -84,9 +84,9 @@ export default function PeopleList() {
               <li key={p.id}>
                 <Card className="p-4 flex flex-row items-center justify-between gap-4">
                   <div className="flex items-center gap-3 min-w-0">
-                    {p.photo_base64 ? (
+                    {p.thumbnail_url ? (
                       <img
-                        src={`data:image/jpeg;base64,${p.photo_base64}`}
+                        src={p.thumbnail_url}
                         alt=""
                         className="w-14 h-14 rounded-full object-cover flex-shrink-0"
                       />
@@ -28,7 +28,7 @@ export default function PersonForm() {
         setName(p.name);
         setRelationship(p.relationship);
         setAbout(p.about ?? "");
-        if (p.photo_base64) setPhotoPreview(`data:image/jpeg;base64,${p.photo_base64}`);
+        if (p.photo_url) setPhotoPreview(p.photo_url);
       } catch (e) {
         setError("Could not load person.");
       } finally {